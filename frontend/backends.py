@@ -0,0 +1,279 @@
+import os
+import asyncio
+import hashlib
+import time
+import logging
+import shlex
+import threading
+from concurrent.futures import CancelledError
+
+import streamlit as st
+
+import settings
+
+
+# Where the claude CLI looks up /slash-command prompt templates
+PROMPT_DIRS = [
+    os.path.join("..", ".claude", "commands"),
+    os.path.join(os.path.expanduser("~"), ".claude", "commands"),
+]
+
+
+def _api_key():
+    try:
+        return st.secrets["ANTHROPIC_API_KEY"]
+    except Exception:
+        return os.environ.get("ANTHROPIC_API_KEY")
+
+
+def extract_prompt(command_line: str) -> str:
+    """Return the ``-p`` prompt argument of a claude CLI command line."""
+    args = shlex.split(command_line)
+    for i, arg in enumerate(args):
+        if arg in ("-p", "--print") and i + 1 < len(args):
+            return args[i + 1]
+    raise ValueError(f"No -p prompt found in command: {command_line}")
+
+
+def _strip_frontmatter(text: str) -> str:
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        if end != -1:
+            return text[end + 4:].lstrip("\n")
+    return text
+
+
+def resolve_prompt(prompt: str) -> str:
+    """Expand a ``/name args`` slash command from its .claude/commands template, as the CLI does."""
+    if not prompt.startswith("/"):
+        return prompt
+    name, _, arguments = prompt[1:].partition(" ")
+    relative = name.replace(":", os.sep) + ".md"
+    for directory in PROMPT_DIRS:
+        path = os.path.join(directory, relative)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                template = _strip_frontmatter(f.read())
+            if "$ARGUMENTS" in template:
+                return template.replace("$ARGUMENTS", arguments)
+            return f"{template}\n\n{arguments}".strip()
+    raise FileNotFoundError(f"Prompt template for /{name} not found in: {', '.join(PROMPT_DIRS)}")
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+SYSTEM_PROMPT = (
+    "You are generating product planning artifacts for the use case provided below. "
+    "When asked for a file, respond with its complete markdown content only. "
+    "Do not describe file operations or wrap the document in a code fence."
+)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _estimate_tokens(text: str) -> int:
+    # About four characters per token for English markdown; only used to decide where caching can pay off
+    return len(text) // 4
+
+
+def build_request(command, usecase_path: str, prompt: str):
+    """Return (system, messages, prefix_key) for generating ``command.output_file`` in-process.
+
+    The CLI reads the use case and upstream artifacts from disk itself; here
+    their contents are sent inline. The request is ordered so that everything
+    shared between artifacts comes first: the use case in the system prompt
+    (shared by every artifact), then the upstream artifacts, and only then the
+    per-artifact instruction. A shared block is marked cacheable only if the
+    prefix ending with it reaches ``SDK_PROMPT_CACHE_MIN_TOKENS``, as the API
+    does not cache shorter ones. ``prefix_key`` identifies the longest cached
+    prefix, or is None when nothing can be cached.
+    """
+    usecase_text = _read_text(os.path.join(usecase_path, "usecase.md"))
+    usecase_block = {"type": "text", "text": f"<usecase path=\"usecase.md\">\n{usecase_text}\n</usecase>"}
+    system = [{"type": "text", "text": SYSTEM_PROMPT}, usecase_block]
+    prefix_tokens = _estimate_tokens(SYSTEM_PROMPT) + _estimate_tokens(usecase_block["text"])
+    h = hashlib.sha256(settings.SDK_MODEL.encode("utf-8") + b"\0" + usecase_text.encode("utf-8"))
+    prefix_key = None
+    if prefix_tokens >= settings.SDK_PROMPT_CACHE_MIN_TOKENS:
+        usecase_block["cache_control"] = CACHE_CONTROL
+        prefix_key = h.hexdigest()
+
+    content = []
+    artifacts = []
+    for path in sorted(command.needs):
+        full_path = os.path.join(usecase_path, path)
+        if os.path.isfile(full_path):
+            text = _read_text(full_path)
+            artifacts.append(f"<artifact path=\"{path}\">\n{text}\n</artifact>")
+            h.update(b"\0" + path.encode("utf-8") + b"\0" + text.encode("utf-8"))
+    if artifacts:
+        artifacts_block = {"type": "text", "text": "\n\n".join(artifacts)}
+        prefix_tokens += _estimate_tokens(artifacts_block["text"])
+        if prefix_tokens >= settings.SDK_PROMPT_CACHE_MIN_TOKENS:
+            artifacts_block["cache_control"] = CACHE_CONTROL
+            prefix_key = h.hexdigest()
+        content.append(artifacts_block)
+    content.append({"type": "text", "text": f"Generate `{command.output_file}`.\n\n{prompt}"})
+    return system, [{"role": "user", "content": content}], prefix_key
+
+
+class SdkBackend:
+    """Runs generations through the Anthropic SDK on one shared asyncio event loop.
+
+    Every generation is a coroutine on the loop, so a single Python process
+    multiplexes many concurrent requests without per-run process start-up.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pilot-sdk-loop", daemon=True)
+        self._thread.start()
+        self._client = None
+        self._primed = {}  # prefix key -> (asyncio.Event, primed_at)
+
+    def _get_client(self):
+        # Created on the loop thread so the underlying HTTP client binds to this loop
+        if self._client is None:
+            from anthropic import AsyncAnthropic
+            self._client = AsyncAnthropic(api_key=_api_key())
+        return self._client
+
+    def run(self, job, command, usecase: str) -> int:
+        """Job runner: schedule the generation on the loop and wait for its exit code."""
+        future = asyncio.run_coroutine_threadsafe(self._generate(job, command, usecase), self._loop)
+        job.set_cancel_hook(future.cancel)
+        if job.cancel_requested:
+            # Cancelled before the hook was registered
+            future.cancel()
+        try:
+            return future.result()
+        except CancelledError:
+            job.append_log("Generation cancelled.\n")
+            return 1
+
+    async def _wait_for_prefix(self, prefix_key: str):
+        """Serialise the first request for a shared prefix so the others read it from the cache.
+
+        Returns an event the caller must set once its response has started (it
+        is the primer), or None when the prefix is already warm or too short
+        to be cached (``prefix_key`` None), in which case waiting cannot help.
+        """
+        if prefix_key is None:
+            return None
+        now = time.time()
+        for key, (event, primed_at) in list(self._primed.items()):
+            if event.is_set() and now - primed_at >= settings.SDK_PROMPT_CACHE_TTL_SECONDS:
+                del self._primed[key]
+        entry = self._primed.get(prefix_key)
+        if entry is not None and time.time() - entry[1] < settings.SDK_PROMPT_CACHE_TTL_SECONDS:
+            event = entry[0]
+            if not event.is_set():
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=settings.SDK_PROMPT_CACHE_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            return None
+        event = asyncio.Event()
+        self._primed[prefix_key] = (event, time.time())
+        return event
+
+    async def _generate(self, job, command, usecase: str) -> int:
+        if not command.output_file or command.produces:
+            raise ValueError(f"'{command.name}' writes more than one output; use backend=cli for it")
+        usecase_path = os.path.join("../workspace", usecase)
+        prompt = resolve_prompt(extract_prompt(command.command))
+        system, messages, prefix_key = build_request(command, usecase_path, prompt)
+        output_path = os.path.join(usecase_path, command.output_file)
+        # Streamed into a side file and moved into place only when complete, so nothing ever sees a partial report
+        tmp_path = f"{output_path}.tmp.{job.id}"
+        primer = await self._wait_for_prefix(prefix_key)
+
+        job.append_log(f"$ sdk {settings.SDK_MODEL} -> {command.output_file}\n")
+        client = self._get_client()
+        pending = ""
+        try:
+            # Tokens go straight into the side file; the job log gets whole lines
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                async with client.messages.stream(
+                    model=settings.SDK_MODEL,
+                    max_tokens=settings.SDK_MAX_TOKENS,
+                    system=system,
+                    messages=messages,
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if primer is not None:
+                            # The prefix is cached once the response starts; release waiting runs
+                            primer.set()
+                            primer = None
+                        out.write(text)
+                        out.flush()
+                        pending += text
+                        if "\n" in pending:
+                            complete, pending = pending.rsplit("\n", 1)
+                            job.append_log(complete + "\n")
+                    final = await stream.get_final_message()
+        except BaseException:
+            if primer is not None:
+                self._primed.pop(prefix_key, None)
+                primer.set()
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if pending:
+            job.append_log(pending + "\n")
+
+        if primer is not None:
+            primer.set()
+
+        usage = final.usage
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        job.metrics.update({
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_tokens": cache_read,
+            "cache_write_tokens": cache_write,
+        })
+        logging.info(
+            f"SDK prompt cache for {command.name} on {usecase}: {cache_read} tokens read, {cache_write} written"
+            + ("" if prefix_key else " (prefix below the cacheable minimum)")
+        )
+        if final.stop_reason == "max_tokens":
+            # A cut-off report must not replace the current one, be recorded as a version or be cached
+            os.remove(tmp_path)
+            job.append_log(
+                f"Output was cut off at max_tokens ({settings.SDK_MAX_TOKENS}); discarded it and kept "
+                f"{command.output_file} as it was. Raise PILOT_SDK_MAX_TOKENS and run again.\n"
+            )
+            logging.warning(f"SDK generation for {command.name} hit max_tokens ({settings.SDK_MAX_TOKENS})")
+            return 1
+        os.replace(tmp_path, output_path)
+        job.append_log(
+            f"Wrote {command.output_file} (stop: {final.stop_reason}; "
+            f"{usage.input_tokens} input / {usage.output_tokens} output tokens; "
+            f"prompt cache: {cache_read} read (hit) / {cache_write} written (miss))\n"
+        )
+        return 0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_sdk_backend() -> SdkBackend:
+    """Return the process-wide SDK backend, starting its event loop on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SdkBackend()
+        return _backend
+
+
+def sdk_runner(command, usecase: str):
+    """Return a job runner that generates ``command`` for ``usecase`` through the SDK."""
+    return lambda job: get_sdk_backend().run(job, command, usecase)
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+import settings
+
+
+DB_PATH = os.path.join(settings.STATE_DIR, "catalog.db")
+WORKSPACE_DIR = "../workspace"
+PREVIEW_CHARS = 280
+# usecase.md is only read for its title and preview; this is plenty for both
+_HEAD_BYTES = 16384
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    slug TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    dir_mtime REAL NOT NULL,
+    usecase_mtime REAL NOT NULL,
+    artifacts TEXT NOT NULL,
+    has_docs INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    docs_mtime REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_projects_title ON projects (title COLLATE NOCASE);
+"""
+
+# Columns added after the first release; existing catalogs get them on open
+_ADDED_COLUMNS = {
+    "docs_mtime": "REAL NOT NULL DEFAULT 0",
+}
+
+# Dashboard sort options -> ORDER BY clause
+SORT_ORDERS = {
+    "title": "title COLLATE NOCASE, slug",
+    "recent": "MAX(usecase_mtime, dir_mtime) DESC, slug",
+    "slug": "slug",
+}
+
+
+def _read_summary(slug: str, usecase_md: str):
+    """(title, preview) of a usecase.md: the first line as title, the text after the blank line as preview."""
+    try:
+        with open(usecase_md, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read(_HEAD_BYTES)
+    except OSError:
+        return slug, ""
+    lines = content.split("\n")
+    title = lines[0].replace("# ", "").strip() if lines else slug
+    description = "\n".join(lines[2:]).strip() if len(lines) > 2 else ""
+    preview = description[:PREVIEW_CHARS] + ("..." if len(description) > PREVIEW_CHARS else "")
+    return title or slug, preview
+
+
+def _site_index(project_dir: str) -> str:
+    return os.path.join(project_dir, "_ra", "site", "index.html")
+
+
+def _artifacts(project_dir: str):
+    """(current ra-*.md artifact names, whether a built docs site exists)."""
+    names = sorted(
+        entry.name for entry in os.scandir(project_dir)
+        if entry.is_file() and entry.name.startswith("ra-") and entry.name.endswith(".md") and "_v" not in entry.name
+    )
+    has_docs = os.path.isfile(_site_index(project_dir))
+    return names, has_docs
+
+
+def _project_mtimes(project_dir: str):
+    """(directory, usecase.md, built docs) mtimes of a project, or None if it has no usecase.md.
+
+    The docs site is built below ``_ra`` without touching the project
+    directory, so its index page is stat'ed separately (0 when not built).
+    """
+    try:
+        dir_mtime = os.stat(project_dir).st_mtime
+        usecase_mtime = os.stat(os.path.join(project_dir, "usecase.md")).st_mtime
+    except OSError:
+        return None
+    try:
+        docs_mtime = os.stat(_site_index(project_dir)).st_mtime
+    except OSError:
+        docs_mtime = 0.0
+    return dir_mtime, usecase_mtime, docs_mtime
+
+
+class Catalog:
+    """SQLite index of the workspace's projects, so listing them does not read every usecase.md.
+
+    ``refresh`` stats each project directory, its usecase.md and its built
+    docs site and only re-reads the projects whose mtimes changed; it runs at most once every
+    ``CATALOG_REFRESH_SECONDS`` unless forced. Writers that know a project
+    changed can call ``refresh_project`` to update it immediately.
+    """
+
+    def __init__(self, path: str, workspace_dir: str):
+        self.path = path
+        self.workspace_dir = workspace_dir
+        self._lock = threading.Lock()
+        self._refreshed_at = float("-inf")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(projects)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE projects ADD COLUMN {column} {column_type}")
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _index(self, conn, slug: str, dir_mtime: float, usecase_mtime: float, docs_mtime: float) -> None:
+        project_dir = os.path.join(self.workspace_dir, slug)
+        title, preview = _read_summary(slug, os.path.join(project_dir, "usecase.md"))
+        artifacts, has_docs = _artifacts(project_dir)
+        conn.execute(
+            """INSERT OR REPLACE INTO projects
+               (slug, title, preview, dir_mtime, usecase_mtime, docs_mtime, artifacts, has_docs, indexed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (slug, title, preview, dir_mtime, usecase_mtime, docs_mtime, json.dumps(artifacts), int(has_docs), time.time()),
+        )
+
+    def refresh(self, force: bool = False) -> int:
+        """Bring the index up to date with the workspace; returns how many projects were re-read."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < settings.CATALOG_REFRESH_SECONDS:
+                return 0
+            self._refreshed_at = now
+
+            seen = {}
+            if os.path.isdir(self.workspace_dir):
+                with os.scandir(self.workspace_dir) as entries:
+                    for entry in entries:
+                        if not entry.is_dir():
+                            continue
+                        mtimes = _project_mtimes(entry.path)
+                        if mtimes is not None:
+                            seen[entry.name] = mtimes
+
+            conn = self._connect()
+            try:
+                with conn:
+                    stored = {
+                        row["slug"]: (row["dir_mtime"], row["usecase_mtime"], row["docs_mtime"])
+                        for row in conn.execute("SELECT slug, dir_mtime, usecase_mtime, docs_mtime FROM projects")
+                    }
+                    changed = [slug for slug, mtimes in seen.items() if stored.get(slug) != mtimes]
+                    for slug in changed:
+                        self._index(conn, slug, *seen[slug])
+                    gone = stored.keys() - seen.keys()
+                    conn.executemany("DELETE FROM projects WHERE slug = ?", [(slug,) for slug in gone])
+            finally:
+                conn.close()
+            if changed or gone:
+                logging.info(f"Catalog refresh: {len(changed)} re-indexed, {len(gone)} removed")
+            return len(changed)
+
+    def refresh_project(self, slug: str) -> None:
+        """Re-index one project now (or drop it if it no longer has a usecase.md)."""
+        project_dir = os.path.join(self.workspace_dir, slug)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    mtimes = _project_mtimes(project_dir)
+                    if mtimes is None:
+                        conn.execute("DELETE FROM projects WHERE slug = ?", (slug,))
+                        return
+                    self._index(conn, slug, *mtimes)
+            finally:
+                conn.close()
+
+    def projects(self, search: str = "", sort: str = "title", limit: int = None, offset: int = 0):
+        """One page of indexed projects and the total number matching ``search``.
+
+        ``search`` matches slug, title or preview case-insensitively; ``sort``
+        is a key of ``SORT_ORDERS``. Projects are dicts with slug, title,
+        preview, artifacts and has_docs.
+        """
+        where, params = "", []
+        if search.strip():
+            pattern = "%" + search.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where = "WHERE slug LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\' OR preview LIKE ? ESCAPE '\\'"
+            params = [pattern] * 3
+        order = SORT_ORDERS.get(sort, SORT_ORDERS["title"])
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM projects {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT slug, title, preview, artifacts, has_docs FROM projects {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                "slug": row["slug"], "title": row["title"], "preview": row["preview"],
+                "artifacts": json.loads(row["artifacts"]), "has_docs": bool(row["has_docs"]),
+            }
+            for row in rows
+        ], total
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Return the process-wide workspace catalog."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog(DB_PATH, WORKSPACE_DIR)
+        return _catalog
@@ -0,0 +1,92 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import settings
+
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Finished turns nobody collected (e.g. the browser tab was closed) are dropped after this
+_ABANDONED_AFTER_SECONDS = 3600
+
+
+class ChatTurn:
+    """One chat reply computed on a background thread.
+
+    ``text`` holds the reply streamed so far, ``result`` the return value of
+    the turn function once it is done.
+    """
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.state = PENDING
+        self.text = ""
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+
+    @property
+    def is_pending(self) -> bool:
+        return self.state == PENDING
+
+    def on_text(self, text: str) -> None:
+        self.text = text
+
+
+class ChatTurnRunner:
+    """Runs chat turns off the Streamlit script thread so the page stays interactive."""
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pilot-chat")
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> ChatTurn:
+        """Run ``fn(*args, on_text=..., **kwargs)`` in the background and return its turn."""
+        turn = ChatTurn(kind)
+        with self._lock:
+            self._prune_locked()
+            self._turns[turn.id] = turn
+        self._executor.submit(self._run, turn, fn, args, kwargs)
+        return turn
+
+    def _run(self, turn: ChatTurn, fn, args, kwargs) -> None:
+        try:
+            turn.result = fn(*args, on_text=turn.on_text, **kwargs)
+            turn.state = DONE
+        except Exception as e:
+            logging.error(f"Chat turn {turn.id} ({turn.kind}) failed: {e}")
+            turn.error = str(e)
+            turn.state = FAILED
+
+    def get(self, turn_id):
+        with self._lock:
+            return self._turns.get(turn_id)
+
+    def pop(self, turn_id):
+        with self._lock:
+            return self._turns.pop(turn_id, None)
+
+    def _prune_locked(self) -> None:
+        cutoff = time.time() - _ABANDONED_AFTER_SECONDS
+        for turn_id in [t.id for t in self._turns.values() if not t.is_pending and t.created_at < cutoff]:
+            del self._turns[turn_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_chat_runner() -> ChatTurnRunner:
+    """Return the process-wide chat turn runner."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ChatTurnRunner(settings.CHAT_WORKERS)
+        return _runner
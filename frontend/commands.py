@@ -0,0 +1,77 @@
+import os
+from typing import NamedTuple, Optional, Tuple
+
+import settings
+
+
+COMMANDS_FILE = "commands.md"
+
+
+class Command(NamedTuple):
+    """One artifact command from commands.md, expanded for a use case."""
+    name: str
+    command: str
+    output_file: Optional[str]
+    needs: Tuple[str, ...] = ()
+    produces: Tuple[str, ...] = ()
+    backend: str = "cli"
+
+    @property
+    def outputs(self) -> Tuple[str, ...]:
+        """Every path (relative to the use case) this command writes."""
+        return ((normalize_path(self.output_file),) if self.output_file else ()) + self.produces
+
+
+def normalize_path(path: str) -> str:
+    """Normalise a use-case-relative artifact path so declarations compare equal."""
+    path = path.strip().replace("\\", "")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.rstrip("/")
+
+
+def _parse_options(text: str) -> dict:
+    """Parse ``key=value`` tokens; list values are separated with ``|``."""
+    options = {}
+    for token in text.split():
+        if "=" not in token:
+            continue
+        key, value = token.split("=", 1)
+        options[key.strip()] = tuple(normalize_path(v) for v in value.split("|") if v.strip())
+    return options
+
+
+def parse_command_line(line: str, usecase: str) -> Optional[Command]:
+    """Parse ``Name,Command Template[,Output File[,key=value ...]]`` for ``usecase``.
+
+    Supported options:
+      needs=a.md|dir/     inputs that must exist before the command can start
+      produces=dir/       extra outputs besides the output file
+      backend=cli|sdk     run through the claude CLI or the in-process SDK backend
+    """
+    parts = [p.strip() for p in line.strip().split(",", 2)]
+    if len(parts) < 2:
+        return None
+    name, command_template = parts[0], parts[1]
+    output_file, options = None, {}
+    if len(parts) > 2:
+        rest = [p.strip() for p in parts[2].split(",", 1)]
+        output_file = rest[0] or None
+        if len(rest) > 1:
+            options = _parse_options(rest[1])
+    relative_usecase_path = os.path.join("workspace", usecase) + os.sep
+    command = command_template.replace("$USECASE", relative_usecase_path)
+    backend = (options.get("backend") or (settings.GENERATION_BACKEND,))[0]
+    return Command(name, command, output_file, options.get("needs", ()), options.get("produces", ()), backend)
+
+
+def load_commands(usecase: str, commands_file: str = COMMANDS_FILE) -> dict:
+    """Return {name: Command} for every entry in commands.md, expanded for ``usecase``."""
+    command_map = {}
+    with open(commands_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                command = parse_command_line(line, usecase)
+                if command:
+                    command_map[command.name] = command
+    return command_map
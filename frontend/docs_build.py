@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import subprocess
+from typing import NamedTuple
+
+import history
+from docs_toolchain import mkdocs_command
+
+
+MANIFEST_NAME = ".build-manifest.json"
+SITE_DIR = "site"
+CONFIG_NAME = "mkdocs.yml"
+# Navigation files of the awesome-pages, awesome-nav and literate-nav plugins
+NAV_FILES = {".pages", ".nav.yml", "SUMMARY.md"}
+
+
+class BuildResult(NamedTuple):
+    ok: bool
+    built: bool         # False when the site was already up to date
+    mode: str           # "skipped", "dirty", "full" or "clean"
+    seconds: float
+    output: str
+
+
+def _page_title(text: str):
+    """Title mkdocs shows for a page in the nav: its ``title:`` front matter or first ``# `` heading."""
+    lines = text.splitlines()
+    if lines and lines[0].strip() == "---":
+        for line in lines[1:]:
+            if line.strip() == "---":
+                break
+            if line.startswith("title:"):
+                return line[len("title:"):].strip().strip("\"'")
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].strip()
+    return None
+
+
+def _describe(path: str):
+    """(sha256, page title) of a source file; the title is None for anything but markdown."""
+    with open(path, "rb") as f:
+        data = f.read()
+    title = _page_title(data.decode("utf-8", "replace")) if path.endswith(".md") else None
+    return hashlib.sha256(data).hexdigest(), title
+
+
+def source_manifest(ra_path: str, previous=None) -> dict:
+    """Map of source path -> [mtime, size, sha256, title] for everything under ``_ra`` except the built site.
+
+    Hashes and titles are reused from ``previous`` when a file's mtime and size are unchanged.
+    """
+    previous = previous or {}
+    manifest = {}
+    for root, dirs, files in os.walk(ra_path):
+        if root == ra_path:
+            dirs[:] = [d for d in dirs if d != SITE_DIR]
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name == MANIFEST_NAME:
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, ra_path)
+            stat = os.stat(path)
+            old = previous.get(rel)
+            if old and len(old) == 4 and old[0] == stat.st_mtime and old[1] == stat.st_size:
+                digest, title = old[2], old[3]
+            else:
+                digest, title = _describe(path)
+            manifest[rel] = [stat.st_mtime, stat.st_size, digest, title]
+    return manifest
+
+
+def _load_manifest(ra_path: str) -> dict:
+    try:
+        with open(os.path.join(ra_path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(ra_path: str, sources: dict) -> None:
+    path = os.path.join(ra_path, MANIFEST_NAME)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"sources": sources, "built_at": time.time()}, f)
+    os.replace(tmp, path)
+
+
+def _build_mode(previous: dict, current: dict) -> str:
+    """How much of the site needs rebuilding for the change from ``previous`` to ``current`` sources."""
+    if {k: v[2] for k, v in previous.items()} == {k: v[2] for k, v in current.items()}:
+        # Only mtimes moved (e.g. a touch or a checkout); content is identical
+        return "skipped"
+    removed = previous.keys() - current.keys()
+    if removed:
+        # Pages that no longer exist must not linger in the site
+        return "clean"
+    if previous.keys() != current.keys():
+        # New pages appear in the navigation of every page
+        return "full"
+    changed = [rel for rel in current if previous[rel][2] != current[rel][2]]
+    for rel in changed:
+        name = os.path.basename(rel)
+        if rel == CONFIG_NAME or name in NAV_FILES or not name.endswith(".md"):
+            # Config, nav files, templates and assets can affect every page
+            return "full"
+        if len(previous[rel]) < 4 or previous[rel][3] != current[rel][3]:
+            # A new page title changes the nav shown on every page
+            return "full"
+    # Only page bodies changed: rebuilding just those pages is enough
+    return "dirty"
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(ra_path: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(ra_path), threading.Lock())
+
+
+def build_docs(ra_path: str, usecase: str = None, force: bool = False) -> BuildResult:
+    """Build the mkdocs site in ``ra_path`` only if its sources changed since the last successful build.
+
+    Unchanged sources skip the build; edits to page bodies use ``mkdocs build
+    --dirty``; anything that can change the navigation (added pages, new page
+    titles, ``mkdocs.yml`` or nav files) or other shared sources rebuild every
+    page without ``--clean``; removed pages force a clean build. Each build is
+    timed and recorded.
+    """
+    with _lock_for(ra_path):
+        started = time.time()
+        stored = _load_manifest(ra_path).get("sources", {})
+        current = source_manifest(ra_path, stored)
+        site_ok = os.path.isfile(os.path.join(ra_path, SITE_DIR, "index.html"))
+        mode = _build_mode(stored, current) if site_ok and not force else "clean"
+
+        if mode == "skipped":
+            if stored != current:
+                _save_manifest(ra_path, current)
+            result = BuildResult(True, False, mode, time.time() - started, "")
+        else:
+            args = ["build"] + {"dirty": ["--dirty"], "full": [], "clean": ["--clean"]}[mode]
+            process = subprocess.run(
+                mkdocs_command() + args, cwd=ra_path, capture_output=True, text=True, check=False
+            )
+            ok = process.returncode == 0
+            if ok:
+                # Record the sources as they were when the build started, so edits made
+                # while it ran are picked up by the next one
+                _save_manifest(ra_path, current)
+            result = BuildResult(ok, True, mode, time.time() - started, process.stderr)
+
+        logging.info(f"Docs build for {ra_path}: {result.mode} in {result.seconds:.2f}s (ok={result.ok})")
+        try:
+            history.record_docs_build(usecase or os.path.basename(os.path.dirname(ra_path)), result.mode, started, result.seconds, result.ok)
+        except Exception as e:
+            logging.error(f"Failed to record docs build: {e}")
+        return result
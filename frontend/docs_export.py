@@ -0,0 +1,132 @@
+import io
+import os
+import glob
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tarfile
+import threading
+from typing import NamedTuple
+
+import settings
+from docs_build import build_docs, SITE_DIR
+
+
+EXPORT_DIR = os.path.join(settings.STATE_DIR, "exports")
+MANIFEST_NAME = "asset-manifest.json"
+# Text-like assets worth pre-compressing; images and fonts are already compressed
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map", ".md"}
+
+
+class ExportResult(NamedTuple):
+    ok: bool
+    path: str           # the .tar archive, or "" on failure
+    digest: str         # content hash of the exported site
+    output: str
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def site_files(site_path: str) -> list:
+    """Sorted relative paths of every file in a built site."""
+    files = []
+    for root, dirs, names in os.walk(site_path):
+        dirs.sort()
+        for name in sorted(names):
+            files.append(os.path.relpath(os.path.join(root, name), site_path))
+    return files
+
+
+def asset_manifest(site_path: str) -> dict:
+    """Map of asset path -> {sha256, size}; the digest of this map identifies the export."""
+    return {
+        rel.replace(os.sep, "/"): {
+            "sha256": _file_hash(os.path.join(site_path, rel)),
+            "size": os.path.getsize(os.path.join(site_path, rel)),
+        }
+        for rel in site_files(site_path)
+    }
+
+
+def _manifest_digest(manifest: dict) -> str:
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes, mtime: float) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _write_archive(site_path: str, usecase: str, manifest: dict, path: str) -> None:
+    """Write the site, a ``.gz`` sidecar for each compressible asset and the manifest to a tar file."""
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    try:
+        with tarfile.open(tmp, "w", format=tarfile.PAX_FORMAT) as tar:
+            for rel, entry in manifest.items():
+                src = os.path.join(site_path, *rel.split("/"))
+                name = f"{usecase}/{rel}"
+                tar.add(src, arcname=name, recursive=False)
+                if os.path.splitext(rel)[1].lower() in COMPRESSIBLE:
+                    with open(src, "rb") as f:
+                        # mtime=0 keeps the sidecars byte-identical across exports of the same site
+                        compressed = gzip.compress(f.read(), compresslevel=9, mtime=0)
+                    if len(compressed) < entry["size"]:
+                        entry["gzip_size"] = len(compressed)
+                        _add_bytes(tar, f"{name}.gz", compressed, os.path.getmtime(src))
+            _add_bytes(
+                tar, f"{usecase}/{MANIFEST_NAME}",
+                json.dumps({"usecase": usecase, "assets": manifest}, indent=2, sort_keys=True).encode("utf-8"),
+                time.time(),
+            )
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(usecase: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(usecase, threading.Lock())
+
+
+def export_docs(ra_path: str, usecase: str) -> ExportResult:
+    """Build the site if its sources changed and return a static export archive for it.
+
+    The archive is ``<usecase>/...`` with every site file, a gzip sidecar
+    (``page.html.gz``) for text assets so static servers can serve them
+    pre-compressed, and ``asset-manifest.json`` with each asset's sha256.
+    Archives are named by the site's content hash and reused until it changes.
+    """
+    with _lock_for(usecase):
+        build = build_docs(ra_path, usecase=usecase)
+        if not build.ok:
+            return ExportResult(False, "", "", build.output)
+
+        site_path = os.path.join(ra_path, SITE_DIR)
+        manifest = asset_manifest(site_path)
+        digest = _manifest_digest(manifest)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, f"{usecase}-{digest[:16]}.tar")
+        if not os.path.isfile(path):
+            started = time.time()
+            _write_archive(site_path, usecase, manifest, path)
+            logging.info(f"Exported docs for {usecase} to {path} in {time.time() - started:.2f}s")
+            for stale in glob.glob(os.path.join(EXPORT_DIR, f"{glob.escape(usecase)}-{'[0-9a-f]' * 16}.tar")):
+                if stale != path:
+                    os.remove(stale)
+        return ExportResult(True, path, digest, "")
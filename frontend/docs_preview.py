@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import errno
+import signal
+import socket
+import logging
+import threading
+import subprocess
+
+import settings
+from docs_toolchain import mkdocs_command
+
+
+REGISTRY_PATH = os.path.join(settings.STATE_DIR, "previews.json")
+# mkdocs serve logs every rebuild; each preview's output goes to <usecase>.log here
+LOG_DIR = os.path.join(settings.STATE_DIR, "previews")
+
+
+class PreviewServer:
+    """One ``mkdocs serve`` live preview process."""
+
+    def __init__(self, usecase: str, port: int, proc):
+        self.usecase = usecase
+        self.port = port
+        self.proc = proc
+        self.pid = proc.pid
+        self.owner_pid = os.getpid()
+        self.started_at = time.time()
+        self.last_used_at = self.started_at
+        self.ready = False
+
+    @property
+    def is_alive(self) -> bool:
+        return self.proc.poll() is None
+
+    @property
+    def url(self) -> str:
+        return f"http://{settings.DOCS_PUBLIC_HOST}:{self.port}/"
+
+    def to_dict(self) -> dict:
+        return {
+            "usecase": self.usecase, "port": self.port, "pid": self.pid, "owner_pid": self.owner_pid,
+            "started_at": self.started_at, "last_used_at": self.last_used_at,
+        }
+
+
+def _log_tail(path: str, limit: int = 2000) -> str:
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - limit))
+            return f.read().decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+def _port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("127.0.0.1", port))
+            return True
+        except OSError:
+            return False
+
+
+def _accepts_connections(port: int, timeout: float = 0.5) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError as e:
+        return e.errno == errno.EPERM
+
+
+def _is_mkdocs_process(pid: int) -> bool:
+    """Guard against PID reuse before killing a server recorded by an earlier app process."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"mkdocs" in f.read()
+    except OSError:
+        return False
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(os.getpgid(pid), signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class PreviewRegistry:
+    """Process-wide registry of live preview servers, shared by all browser sessions.
+
+    Ports are probed for availability instead of counted up per session,
+    each server's PID is recorded (also on disk, so servers orphaned by an
+    earlier app process are cleaned up), and a reaper thread stops servers
+    that died, stopped answering, or were not used for
+    ``PREVIEW_IDLE_SECONDS``.
+    """
+
+    def __init__(self):
+        self._servers = {}  # usecase -> PreviewServer
+        self._lock = threading.RLock()
+        # Serialises starts of one use case; held while waiting for the server, unlike ``_lock``
+        self._start_locks = {}
+        self._reap_orphans()
+        self._reaper = threading.Thread(target=self._reap_loop, name="pilot-preview-reaper", daemon=True)
+        self._reaper.start()
+
+    # --- Persistence ---
+    def _save_locked(self) -> None:
+        os.makedirs(os.path.dirname(REGISTRY_PATH) or ".", exist_ok=True)
+        tmp = f"{REGISTRY_PATH}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([s.to_dict() for s in self._servers.values()], f)
+        os.replace(tmp, REGISTRY_PATH)
+
+    def _reap_orphans(self) -> None:
+        try:
+            with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            if entry.get("owner_pid") != os.getpid() and not _pid_alive(entry.get("owner_pid", 0)) \
+                    and _is_mkdocs_process(entry["pid"]):
+                logging.info(f"Stopping orphaned live preview for {entry['usecase']} (PID {entry['pid']})")
+                _kill_group(entry["pid"])
+        with self._lock:
+            self._save_locked()
+
+    # --- Allocation ---
+    def _allocate_port_locked(self) -> int:
+        taken = {s.port for s in self._servers.values()}
+        for port in range(settings.PREVIEW_PORT_BASE, settings.PREVIEW_PORT_BASE + settings.PREVIEW_PORT_RANGE):
+            if port not in taken and _port_free(port):
+                return port
+        raise RuntimeError(
+            f"No free port for a live preview in {settings.PREVIEW_PORT_BASE}-"
+            f"{settings.PREVIEW_PORT_BASE + settings.PREVIEW_PORT_RANGE - 1}"
+        )
+
+    @staticmethod
+    def _wait_ready(server: PreviewServer, timeout: float) -> bool:
+        """Wait until the server accepts connections; False if it exited or the timeout passed."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not server.is_alive:
+                return False
+            if _accepts_connections(server.port, timeout=0.2):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _start_lock(self, usecase: str) -> threading.Lock:
+        with self._lock:
+            return self._start_locks.setdefault(usecase, threading.Lock())
+
+    def start(self, usecase: str, ra_path: str) -> PreviewServer:
+        """Return a ready live preview for ``usecase``, starting (or restarting) it if needed.
+
+        The registry lock is only held to reserve a port and register the
+        server; waiting for it to come up does not block other use cases,
+        lookups or the reaper.
+        """
+        with self._start_lock(usecase):
+            with self._lock:
+                existing = self._servers.get(usecase)
+                if existing is not None and existing.is_alive and _accepts_connections(existing.port):
+                    existing.last_used_at = time.time()
+                    return existing
+                if existing is not None:
+                    self._stop_locked(usecase)
+
+            last_error = "did not start"
+            os.makedirs(LOG_DIR, exist_ok=True)
+            log_path = os.path.join(LOG_DIR, f"{usecase}.log")
+            for _ in range(3):
+                with self._lock:
+                    port = self._allocate_port_locked()
+                    # A file rather than a pipe: nobody drains a long-running server's pipe, and a full one blocks it
+                    with open(log_path, "wb") as log:
+                        proc = subprocess.Popen(
+                            mkdocs_command() + ["serve", f"--dev-addr=127.0.0.1:{port}"],
+                            cwd=ra_path,
+                            stdout=subprocess.DEVNULL,
+                            stderr=log,
+                            preexec_fn=os.setsid,
+                        )
+                    server = PreviewServer(usecase, port, proc)
+                    self._servers[usecase] = server
+                    self._save_locked()
+                ready = self._wait_ready(server, settings.PREVIEW_START_TIMEOUT_SECONDS)
+                with self._lock:
+                    if self._servers.get(usecase) is not server:
+                        # Stopped by another session while starting
+                        raise RuntimeError(f"Live preview for {usecase} was stopped while starting")
+                    if ready:
+                        server.ready = True
+                        server.last_used_at = time.time()
+                        return server
+                    if server.is_alive:
+                        last_error = f"not listening on port {port} after {settings.PREVIEW_START_TIMEOUT_SECONDS}s"
+                        self._stop_locked(usecase)
+                        break
+                    # Exited early: most likely lost a race for the port; try the next free one
+                    last_error = _log_tail(log_path)
+                    self._stop_locked(usecase)
+            raise RuntimeError(f"Live preview for {usecase} failed: {last_error}")
+
+    def get(self, usecase: str):
+        """The running preview for ``usecase`` (marking it as used), or None."""
+        with self._lock:
+            server = self._servers.get(usecase)
+            if server is None or not server.ready or not server.is_alive:
+                return None
+            server.last_used_at = time.time()
+            return server
+
+    def _stop_locked(self, usecase: str) -> None:
+        server = self._servers.pop(usecase, None)
+        if server is None:
+            return
+        if server.is_alive:
+            _kill_group(server.pid)
+            try:
+                server.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(os.getpgid(server.pid), signal.SIGKILL)
+                server.proc.wait()
+        self._save_locked()
+
+    def stop(self, usecase: str) -> None:
+        with self._lock:
+            self._stop_locked(usecase)
+
+    # --- Reaper ---
+    def reap(self) -> None:
+        """Stop previews that died, fail their health check, or have been idle too long."""
+        now = time.time()
+        with self._lock:
+            for usecase, server in list(self._servers.items()):
+                if not server.ready:
+                    # Still starting; ``start`` stops it if it never comes up
+                    continue
+                if not server.is_alive:
+                    reason = f"exited with {server.proc.returncode}"
+                elif now - server.last_used_at > settings.PREVIEW_IDLE_SECONDS:
+                    reason = "idle"
+                elif not _accepts_connections(server.port):
+                    reason = "not answering"
+                else:
+                    continue
+                logging.info(f"Reaping live preview for {usecase} on port {server.port}: {reason}")
+                self._stop_locked(usecase)
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(settings.PREVIEW_REAP_INTERVAL_SECONDS)
+            try:
+                self.reap()
+            except Exception as e:
+                logging.error(f"Live preview reaper failed: {e}")
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [s.to_dict() for s in self._servers.values()]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_preview_registry() -> PreviewRegistry:
+    """Return the process-wide live preview registry, starting its reaper on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PreviewRegistry()
+        return _registry
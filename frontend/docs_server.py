@@ -0,0 +1,239 @@
+import os
+import time
+import shutil
+import logging
+import mimetypes
+import threading
+import urllib.parse
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import settings
+from docs_build import build_docs, SITE_DIR
+from docs_export import export_docs
+
+
+WORKSPACE_DIR = "../workspace"
+URL_PREFIX = "/docs/"
+EXPORT_PREFIX = "/export/"
+
+
+def site_path(usecase: str) -> str:
+    return os.path.join(WORKSPACE_DIR, usecase, "_ra", SITE_DIR)
+
+
+def _valid_usecase(name: str) -> bool:
+    return bool(name) and name not in (".", "..") and "/" not in name and "\\" not in name
+
+
+class _Freshness:
+    """Throttles on-demand rebuild checks to one per use case every few seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def due(self, usecase: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked.get(usecase, float("-inf")) < self.interval:
+                return False
+            self._checked[usecase] = now
+            return True
+
+
+class DocsRequestHandler(BaseHTTPRequestHandler):
+    """Serves ``/docs/<usecase>/...`` from ``workspace/<usecase>/_ra/site`` with conditional GET support,
+    and ``/export/<usecase>.tar`` static export downloads."""
+
+    server_version = "PilotDocs/1.0"
+    freshness = None  # set by DocsServer
+
+    def log_message(self, format, *args):
+        logging.debug("docs server: " + format % args)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _resolve(self):
+        """Map the request path to (usecase, file path); sends the error/redirect itself and returns None."""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if not path.startswith(URL_PREFIX):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        usecase, _, rest = path[len(URL_PREFIX):].partition("/")
+        if not _valid_usecase(usecase):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        if not _ and not rest:
+            # /docs/<usecase> -> /docs/<usecase>/ so relative asset links resolve
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", f"{URL_PREFIX}{urllib.parse.quote(usecase)}/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        # Cheap on-demand rebuild: page navigations check the sources at most every few seconds
+        ra_path = os.path.dirname(site_path(usecase))
+        if (not rest or rest.endswith("/") or rest.endswith(".html")) and os.path.isdir(ra_path) \
+                and self.freshness.due(usecase):
+            result = build_docs(ra_path, usecase=usecase)
+            if not result.ok:
+                logging.error(f"On-demand docs rebuild for {usecase} failed: {result.output[-2000:]}")
+
+        root = os.path.realpath(site_path(usecase))
+        target = os.path.realpath(os.path.join(root, rest))
+        if target != root and not target.startswith(root + os.sep):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        if os.path.isdir(target):
+            target = os.path.join(target, "index.html")
+        if not os.path.isfile(target):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+        return usecase, target
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _serve_export(self, path: str, head: bool):
+        """``/export/<usecase>.tar``: the pre-compressed static export, streamed from disk."""
+        name = path[len(EXPORT_PREFIX):]
+        usecase = name[:-len(".tar")] if name.endswith(".tar") else ""
+        ra_path = os.path.dirname(site_path(usecase))
+        if not _valid_usecase(usecase) or not os.path.isdir(ra_path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        result = export_docs(ra_path, usecase)
+        if not result.ok:
+            logging.error(f"Docs export for {usecase} failed: {result.output[-2000:]}")
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Documentation build failed")
+            return
+        etag = f'"{result.digest[:32]}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        # Open before answering: a newer export may replace the file, but this handle stays valid
+        with open(result.path, "rb") as f:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/x-tar")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Content-Disposition", f'attachment; filename="{usecase}-docs.tar"')
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if not head:
+                shutil.copyfileobj(f, self.wfile, 1024 * 1024)
+
+    def _serve(self, head: bool):
+        request_path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if request_path.startswith(EXPORT_PREFIX):
+            self._serve_export(request_path, head)
+            return
+        resolved = self._resolve()
+        if resolved is None:
+            return
+        _, path = resolved
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if self._not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
+
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # Always revalidate; unchanged files cost a 304 without a body
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if not head:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+
+class DocsServer:
+    """One long-lived static HTTP server for the built documentation of every use case."""
+
+    def __init__(self, host: str, port: int):
+        handler = type("Handler", (DocsRequestHandler,), {"freshness": _Freshness(settings.DOCS_REBUILD_CHECK_SECONDS)})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="pilot-docs-server", daemon=True)
+        self._thread.start()
+
+    def url(self, usecase: str) -> str:
+        return f"http://{settings.DOCS_PUBLIC_HOST}:{self.port}{URL_PREFIX}{urllib.parse.quote(usecase)}/"
+
+    def export_url(self, usecase: str) -> str:
+        return f"http://{settings.DOCS_PUBLIC_HOST}:{self.port}{EXPORT_PREFIX}{urllib.parse.quote(usecase)}.tar"
+
+
+_server = None
+_server_error = None
+_server_lock = threading.Lock()
+
+
+def get_docs_server():
+    """Return the process-wide docs server, starting it on first use; None if it could not start.
+
+    A failure to bind the port is remembered, so reruns do not retry it;
+    ``docs_server_error`` says why.
+    """
+    global _server, _server_error
+    with _server_lock:
+        if _server is None and _server_error is None:
+            try:
+                _server = DocsServer(settings.DOCS_SERVER_HOST, settings.DOCS_SERVER_PORT)
+                logging.info(f"Documentation server listening on port {_server.port}")
+            except OSError as e:
+                _server_error = (
+                    f"The documentation server could not listen on {settings.DOCS_SERVER_HOST}:"
+                    f"{settings.DOCS_SERVER_PORT} ({e.strerror or e}). Free the port or set "
+                    f"PILOT_DOCS_SERVER_PORT, then restart the app."
+                )
+                logging.error(_server_error)
+        return _server
+
+
+def docs_server_error():
+    """Why the docs server is not running, or None."""
+    return _server_error
+
+
+def docs_url(usecase: str):
+    """URL of ``usecase``'s built documentation on the shared docs server, or None if it is not running."""
+    server = get_docs_server()
+    return server.url(usecase) if server else None
+
+
+def export_url(usecase: str):
+    """Download URL of ``usecase``'s pre-compressed static export, or None if the docs server is not running."""
+    server = get_docs_server()
+    return server.export_url(usecase) if server else None
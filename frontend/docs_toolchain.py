@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import logging
+import importlib
+import threading
+import subprocess
+from importlib import metadata
+
+from packaging.requirements import Requirement
+
+import settings
+
+
+DOCS_REQUIREMENTS = [
+    "mkdocs>=1.5.0",
+    "mkdocs-material>=9.0.0",
+    "mkdocs-mermaid2-plugin>=1.0.0",
+    "pymdown-extensions>=10.0.0",
+    "mkdocs-awesome-pages-plugin>=2.8.0",
+    "mkdocs-minify-plugin>=0.7.0",
+    "mkdocs-git-revision-date-localized-plugin>=1.2.0",
+]
+
+# Prints {"name": "version" | null} for the distributions named on the command line
+_VERSIONS_SCRIPT = (
+    "import sys, json\n"
+    "from importlib import metadata\n"
+    "def v(n):\n"
+    "    try:\n"
+    "        return metadata.version(n)\n"
+    "    except metadata.PackageNotFoundError:\n"
+    "        return None\n"
+    "print(json.dumps({n: v(n) for n in sys.argv[1:]}))\n"
+)
+
+
+def docs_python() -> str:
+    """Interpreter of the environment that builds the docs: a dedicated venv if configured, else this one."""
+    if settings.DOCS_VENV:
+        bin_dir = "Scripts" if os.name == "nt" else "bin"
+        return os.path.join(settings.DOCS_VENV, bin_dir, "python")
+    return sys.executable
+
+
+def mkdocs_command() -> list:
+    """Command prefix that runs mkdocs from the docs environment."""
+    return [docs_python(), "-m", "mkdocs"]
+
+
+def _installed_versions(names) -> dict:
+    python = docs_python()
+    if python == sys.executable:
+        versions = {}
+        for name in names:
+            try:
+                versions[name] = metadata.version(name)
+            except metadata.PackageNotFoundError:
+                versions[name] = None
+        return versions
+    result = subprocess.run(
+        [python, "-c", _VERSIONS_SCRIPT, *names], capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(result.stdout)
+
+
+def missing_requirements(requirements=DOCS_REQUIREMENTS) -> list:
+    """Requirement specifiers not satisfied by the installed package metadata."""
+    parsed = [Requirement(r) for r in requirements]
+    versions = _installed_versions([r.name for r in parsed])
+    return [
+        str(r) for r in parsed
+        if versions.get(r.name) is None or not r.specifier.contains(versions[r.name], prereleases=True)
+    ]
+
+
+_ready = False
+_lock = threading.Lock()
+
+
+def ensure_docs_toolchain():
+    """Make sure the documentation toolchain is installed; returns (ok, error output).
+
+    The check runs once per process: after it succeeds, later calls return
+    immediately. Only unsatisfied requirements are installed.
+    """
+    global _ready
+    with _lock:
+        if _ready:
+            return True, ""
+        try:
+            missing = missing_requirements()
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            return False, f"Could not inspect the documentation environment ({docs_python()}): {e}"
+        if missing:
+            logging.info(f"Installing missing documentation packages: {', '.join(missing)}")
+            install = subprocess.run(
+                [docs_python(), "-m", "pip", "install", *missing], capture_output=True, text=True, check=False
+            )
+            if install.returncode != 0:
+                return False, install.stderr
+            # Let importlib see the distributions pip just added
+            importlib.invalidate_caches()
+            still_missing = missing_requirements()
+            if still_missing:
+                return False, f"Still unsatisfied after install: {', '.join(still_missing)}"
+        _ready = True
+        return True, ""
+
+
+def toolchain_ready() -> bool:
+    """Whether the toolchain check already succeeded in this process."""
+    return _ready
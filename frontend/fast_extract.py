@@ -0,0 +1,171 @@
+import re
+from typing import NamedTuple
+
+
+class FieldMatch(NamedTuple):
+    value: str
+    confidence: float
+
+
+class FastExtraction(NamedTuple):
+    fields: dict        # field -> FieldMatch
+    residual: list      # content words no rule could explain
+
+    def resolved(self, min_confidence: float) -> dict:
+        """Values of the fields matched with at least ``min_confidence``."""
+        return {f: m.value for f, m in self.fields.items() if m.confidence >= min_confidence}
+
+
+# --- Gazetteers ---
+_COUNTRIES = (
+    "Afghanistan, Albania, Algeria, Andorra, Angola, Argentina, Armenia, Australia, Austria, Azerbaijan, "
+    "Bahamas, Bahrain, Bangladesh, Barbados, Belarus, Belgium, Belize, Benin, Bhutan, Bolivia, "
+    "Bosnia and Herzegovina, Botswana, Brazil, Brunei, Bulgaria, Burkina Faso, Burundi, Cambodia, Cameroon, "
+    "Canada, Cape Verde, Central African Republic, Chad, Chile, China, Colombia, Comoros, Costa Rica, Croatia, "
+    "Cuba, Cyprus, Czech Republic, Denmark, Djibouti, Dominican Republic, Ecuador, Egypt, El Salvador, "
+    "Equatorial Guinea, Eritrea, Estonia, Eswatini, Ethiopia, Fiji, Finland, France, Gabon, Gambia, Georgia, "
+    "Germany, Ghana, Greece, Guatemala, Guinea, Guyana, Haiti, Honduras, Hong Kong, Hungary, Iceland, India, "
+    "Indonesia, Iran, Iraq, Ireland, Israel, Italy, Ivory Coast, Jamaica, Japan, Jordan, Kazakhstan, Kenya, "
+    "Kosovo, Kuwait, Kyrgyzstan, Laos, Latvia, Lebanon, Lesotho, Liberia, Libya, Liechtenstein, Lithuania, "
+    "Luxembourg, Madagascar, Malawi, Malaysia, Maldives, Mali, Malta, Mauritania, Mauritius, Mexico, Moldova, "
+    "Monaco, Mongolia, Montenegro, Morocco, Mozambique, Myanmar, Namibia, Nepal, Netherlands, New Zealand, "
+    "Nicaragua, Niger, Nigeria, North Korea, North Macedonia, Norway, Oman, Pakistan, Panama, Papua New Guinea, "
+    "Paraguay, Peru, Philippines, Poland, Portugal, Qatar, Romania, Russia, Rwanda, San Marino, Saudi Arabia, "
+    "Senegal, Serbia, Seychelles, Sierra Leone, Singapore, Slovakia, Slovenia, Somalia, South Africa, "
+    "South Korea, South Sudan, Spain, Sri Lanka, Sudan, Suriname, Sweden, Switzerland, Syria, Taiwan, "
+    "Tajikistan, Tanzania, Thailand, Togo, Trinidad and Tobago, Tunisia, Turkey, Turkmenistan, Uganda, Ukraine, "
+    "United Arab Emirates, United Kingdom, United States, Uruguay, Uzbekistan, Venezuela, Vietnam, Yemen, "
+    "Zambia, Zimbabwe, European Union"
+)
+
+_COUNTRY_ALIASES = {
+    "usa": "United States", "america": "United States", "united states of america": "United States",
+    "great britain": "United Kingdom", "britain": "United Kingdom", "england": "United Kingdom",
+    "scotland": "United Kingdom", "wales": "United Kingdom", "holland": "Netherlands",
+    "the netherlands": "Netherlands", "czechia": "Czech Republic", "turkiye": "Turkey", "türkiye": "Turkey",
+    "deutschland": "Germany", "korea": "South Korea", "uae": "United Arab Emirates", "europe": "European Union",
+    "côte d'ivoire": "Ivory Coast", "viet nam": "Vietnam", "macedonia": "North Macedonia",
+    "worldwide": "Global", "global": "Global", "globally": "Global", "international": "Global",
+}
+
+# Short codes that are also English words; only accepted when written in capitals
+_COUNTRY_CODES = {"US": "United States", "UK": "United Kingdom", "EU": "European Union", "USA": "United States"}
+
+_PLATFORMS = {
+    "web": "Web", "website": "Web", "browser": "Web", "webapp": "Web", "web app": "Web", "pwa": "Web",
+    "mobile": "Mobile", "smartphone": "Mobile", "smartphones": "Mobile", "phone": "Mobile", "phones": "Mobile",
+    "ios": "iOS", "iphone": "iOS", "ipad": "iOS", "android": "Android",
+    "desktop": "Desktop", "windows": "Windows", "macos": "macOS", "mac": "macOS", "linux": "Linux",
+    "tablet": "Tablet", "tablets": "Tablet", "api": "API", "rest api": "API", "cli": "CLI",
+    "command line": "CLI", "smart tv": "Smart TV", "tv": "Smart TV", "kiosk": "Kiosk", "wearable": "Wearables",
+    "wearables": "Wearables", "smartwatch": "Wearables", "cloud": "Cloud", "saas": "Cloud",
+}
+
+CRITICALITY_LABELS = {1: "Low", 2: "Medium-Low", 3: "Medium", 4: "High", 5: "Critical"}
+
+_CRITICALITY_KEYWORDS = {
+    "low": 1, "minor": 1, "medium-low": 2, "medium low": 2, "low-medium": 2, "moderate": 3, "medium": 3,
+    "high": 4, "important": 4, "critical": 5, "mission critical": 5, "mission-critical": 5, "very high": 5,
+}
+
+# Words that carry no field information, e.g. "we will deploy in Germany and France"
+_FILLER = set("""
+a an the and or & also plus both as well only just mainly mostly primarily probably maybe
+in on for to at of with across into from by via
+we i our us it its it's is are be will would should can could need needs want wants
+deploy deployed deploying deployment launch launched launching release released available run running
+target targets targeting support supported supporting country countries platform platforms
+app apps application applications version versions based first initially later too
+criticality level priority rating rated score business
+yes sure ok okay please thanks thank you i'd say would say think guess
+""".split())
+
+_WORD_RE = re.compile(r"[^\W_][\w'’&.-]*|&")
+
+_GAZETTEER = {}
+for _name in _COUNTRIES.split(", "):
+    _GAZETTEER[_name.lower()] = ("countries", _name)
+for _alias, _name in _COUNTRY_ALIASES.items():
+    _GAZETTEER[_alias] = ("countries", _name)
+for _alias, _name in _PLATFORMS.items():
+    _GAZETTEER[_alias] = ("platforms", _name)
+_MAX_PHRASE = max(len(k.split()) for k in _GAZETTEER)
+
+
+def _tokens(text: str):
+    return [(m.group(0).strip(".’'-"), m.group(0)) for m in _WORD_RE.finditer(text)]
+
+
+def _add(found: dict, field: str, value: str) -> None:
+    values = found.setdefault(field, [])
+    if value not in values:
+        values.append(value)
+
+
+def extract(text: str, current_step: str = None) -> FastExtraction:
+    """Extract countries, platforms and criticality from ``text`` without calling an LLM.
+
+    Gazetteer and keyword hits get a high confidence when they answer the
+    question being asked (``current_step``) or when every content word of the
+    message is explained; otherwise they are reported with a lower confidence
+    so the caller can leave them to the LLM. A message that is a single
+    entity for another field ("India" when asked for the project name) is
+    more likely an answer to the question than a volunteered detail, so it
+    gets a low confidence too.
+    """
+    # "4/5" and "4 out of 5" are a single criticality answer
+    text = re.sub(r"\b([1-5])\s*(?:/|out of)\s*5\b", r"\1", text)
+    tokens = _tokens(text)
+    found = {}
+    covered = [False] * len(tokens)
+    explicit_criticality = any(t.lower() in ("criticality", "priority", "level") for t, _ in tokens)
+    criticality_expected = current_step == "criticality" or explicit_criticality
+
+    i = 0
+    while i < len(tokens):
+        # Longest gazetteer phrase starting at token i
+        for length in range(min(_MAX_PHRASE, len(tokens) - i), 0, -1):
+            phrase = " ".join(t.lower() for t, _ in tokens[i:i + length])
+            raw = tokens[i][1].strip(".,")
+            hit = None
+            if length == 1 and raw in _COUNTRY_CODES:
+                hit = ("countries", _COUNTRY_CODES[raw])
+            elif phrase in _GAZETTEER:
+                hit = _GAZETTEER[phrase]
+            elif criticality_expected and phrase in _CRITICALITY_KEYWORDS:
+                level = _CRITICALITY_KEYWORDS[phrase]
+                hit = ("criticality", f"{level} ({CRITICALITY_LABELS[level]})")
+            if hit:
+                _add(found, *hit)
+                covered[i:i + length] = [True] * length
+                i += length
+                break
+        else:
+            word = tokens[i][0]
+            if criticality_expected and re.fullmatch(r"[1-5]", word):
+                level = int(word)
+                _add(found, "criticality", f"{level} ({CRITICALITY_LABELS[level]})")
+                covered[i] = True
+            i += 1
+
+    residual = [
+        word for (word, _), is_covered in zip(tokens, covered)
+        if not is_covered and word.lower() not in _FILLER and not re.fullmatch(r"[\d/.-]+", word)
+    ]
+
+    single_entity = sum(len(values) for values in found.values()) == 1
+    fields = {}
+    for field, values in found.items():
+        if field == "criticality" and len(values) > 1:
+            # Conflicting levels, e.g. "3 or 4": let the LLM decide
+            fields[field] = FieldMatch(values[0], 0.5)
+            continue
+        if field == current_step:
+            confidence = 0.95
+        elif single_entity and current_step:
+            # e.g. "Sudan" as a project name or "Web" as a description: let the LLM decide
+            confidence = 0.5
+        else:
+            confidence = 0.7 if residual else 0.95
+        fields[field] = FieldMatch(", ".join(values), confidence)
+    return FastExtraction(fields, residual)
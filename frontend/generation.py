@@ -0,0 +1,150 @@
+import os
+import hashlib
+import logging
+import shutil
+import threading
+
+import settings
+from jobs import get_job_manager, SUCCEEDED
+from backends import sdk_runner, resolve_prompt, extract_prompt, SYSTEM_PROMPT
+from version_store import get_version_store, GENERATED
+
+
+CACHE_DIR = os.path.join(settings.STATE_DIR, "cache")
+
+
+# --- Content-addressed generation cache ---
+def _hash_path(h, path: str) -> None:
+    """Feed a file, or every file below a directory, into hash ``h``."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                h.update(os.path.relpath(file_path, path).encode("utf-8"))
+                _hash_path(h, file_path)
+    elif os.path.isfile(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                h.update(chunk)
+    else:
+        h.update(b"<missing>")
+
+
+def cache_key(command, usecase_path: str) -> str:
+    """Hash of everything a generation depends on: use case text, expanded command and upstream artifacts.
+
+    For the SDK backend this includes the model and the prompt actually sent
+    (system prompt and expanded slash-command template), which the command
+    line alone does not pin down.
+    """
+    h = hashlib.sha256()
+    h.update(b"usecase.md\0")
+    _hash_path(h, os.path.join(usecase_path, "usecase.md"))
+    h.update(b"\0command\0" + command.command.encode("utf-8"))
+    h.update(b"\0backend\0" + command.backend.encode("utf-8"))
+    if command.backend == "sdk":
+        h.update(b"\0model\0" + settings.SDK_MODEL.encode("utf-8"))
+        h.update(b"\0system\0" + SYSTEM_PROMPT.encode("utf-8"))
+        try:
+            prompt = resolve_prompt(extract_prompt(command.command))
+        except (OSError, ValueError):
+            # The run itself will report the missing template
+            prompt = "<unresolved>"
+        h.update(b"\0prompt\0" + prompt.encode("utf-8"))
+    for path in sorted(command.needs):
+        h.update(b"\0" + path.encode("utf-8") + b"\0")
+        _hash_path(h, os.path.join(usecase_path, path))
+    return h.hexdigest()
+
+
+def _entry_dir(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], key)
+
+
+def restore_from_cache(key: str, command, usecase_path: str) -> bool:
+    """Copy cached outputs for ``key`` into the use case; False on a miss."""
+    entry = _entry_dir(key)
+    outputs = command.outputs
+    if not outputs or not all(os.path.exists(os.path.join(entry, p)) for p in outputs):
+        return False
+    for path in outputs:
+        src, dst = os.path.join(entry, path), os.path.join(usecase_path, path)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+            shutil.copy2(src, dst)
+    return True
+
+
+def store_in_cache(key: str, command, usecase_path: str) -> None:
+    """Save a successful generation's outputs under ``key``."""
+    outputs = command.outputs
+    if not outputs or not all(os.path.exists(os.path.join(usecase_path, p)) for p in outputs):
+        return
+    entry = _entry_dir(key)
+    tmp = f"{entry}.tmp{os.getpid()}.{threading.get_ident()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    for path in outputs:
+        src, dst = os.path.join(usecase_path, path), os.path.join(tmp, path)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        else:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+    shutil.rmtree(entry, ignore_errors=True)
+    try:
+        os.replace(tmp, entry)
+    except OSError:
+        # An identical job stored the same key in the meantime; keep its entry
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(entry):
+            raise
+
+
+def record_outputs(command, usecase_path: str) -> None:
+    """Keep the use case's version manifest in step with the reports a generation wrote."""
+    store = get_version_store(usecase_path)
+    for path in command.outputs:
+        if path.endswith(".md") and "/" not in path:
+            try:
+                store.record_current(path, GENERATED)
+            except OSError as e:
+                logging.error(f"Recording {path} in the version manifest failed: {e}")
+
+
+# --- Submission ---
+def submit_generation(command, usecase: str, force: bool = False, on_complete=None):
+    """Run ``command`` for ``usecase`` through the job engine, serving identical re-runs from the cache.
+
+    ``force`` bypasses the cache lookup (the fresh result is still cached).
+    """
+    manager = get_job_manager()
+    usecase_path = os.path.join("../workspace", usecase)
+    key = cache_key(command, usecase_path)
+
+    if not force:
+        try:
+            if restore_from_cache(key, command, usecase_path):
+                logging.info(f"Generation cache hit for {command.name} on {usecase} ({key[:12]})")
+                record_outputs(command, usecase_path)
+                restored = ", ".join(command.outputs)
+                return manager.add_finished(
+                    command.name, usecase, command.command,
+                    f"♻️ Inputs unchanged — restored {restored} from the generation cache ({key[:12]}).\n",
+                    on_complete=on_complete
+                )
+        except OSError as e:
+            logging.error(f"Generation cache restore failed for {command.name}: {e}")
+
+    def _store(job):
+        # Failed or cancelled runs may still have written (or removed) a report
+        record_outputs(command, usecase_path)
+        if job.state == SUCCEEDED:
+            store_in_cache(key, command, usecase_path)
+
+    runner = sdk_runner(command, usecase) if command.backend == "sdk" else None
+    return manager.submit(
+        command.name, usecase, command.command, on_complete=[_store] + list(on_complete or []), runner=runner
+    )
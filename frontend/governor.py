@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+
+import settings
+
+
+class AdmissionController:
+    """Caps concurrent backend CLI processes and their start rate across all sessions.
+
+    Callers wait in a FIFO queue; the head is admitted once a concurrency slot
+    is free and the token bucket (``rate_per_minute`` refill, ``burst``
+    capacity) holds a token.
+    """
+
+    def __init__(self, max_concurrent: int, rate_per_minute: float, burst: int):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.rate_per_second = max(0.0, float(rate_per_minute)) / 60.0
+        self.burst = max(1, int(burst))
+        self._cond = threading.Condition()
+        self._waiting = deque()
+        self._active = 0
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        if self.rate_per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        else:
+            # A rate of 0 disables rate limiting; only the concurrency cap applies
+            self._tokens = float(self.burst)
+        self._last_refill = now
+
+    def acquire(self, ticket, cancelled=None) -> bool:
+        """Block until ``ticket`` is admitted; returns False if ``cancelled()`` became true first."""
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    if cancelled is not None and cancelled():
+                        return False
+                    self._refill_locked()
+                    is_head = self._waiting[0] == ticket
+                    if is_head and self._active < self.max_concurrent and self._tokens >= 1:
+                        self._waiting.popleft()
+                        self._active += 1
+                        self._tokens -= 1
+                        self._cond.notify_all()
+                        return True
+                    timeout = 1.0
+                    if is_head and self._active < self.max_concurrent and self.rate_per_second > 0:
+                        # Only the rate limit is holding us back: sleep until the next token
+                        timeout = min(timeout, max(0.01, (1 - self._tokens) / self.rate_per_second))
+                    self._cond.wait(timeout)
+            finally:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Wake waiters so they can re-check cancellation."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def position(self, ticket):
+        """1-based position of ``ticket`` in the wait queue, or None if it is not waiting."""
+        with self._cond:
+            try:
+                return self._waiting.index(ticket) + 1
+            except ValueError:
+                return None
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            self._refill_locked()
+            return {
+                "active": self._active,
+                "waiting": len(self._waiting),
+                "max_concurrent": self.max_concurrent,
+                "tokens": int(self._tokens),
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller for backend CLI invocations."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                settings.CLI_MAX_CONCURRENT, settings.CLI_RATE_PER_MINUTE, settings.CLI_RATE_BURST
+            )
+        return _controller
@@ -0,0 +1,326 @@
+import os
+import math
+import time
+import logging
+import sqlite3
+import threading
+
+import settings
+
+
+DB_PATH = os.path.join(settings.STATE_DIR, "history.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    command TEXT NOT NULL,
+    usecase TEXT,
+    state TEXT NOT NULL,
+    exit_code INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    output_bytes INTEGER NOT NULL DEFAULT 0,
+    ran_process INTEGER NOT NULL DEFAULT 1,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_read_tokens INTEGER,
+    cache_write_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_command ON runs (command, finished_at);
+CREATE INDEX IF NOT EXISTS idx_runs_usecase ON runs (usecase, finished_at);
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    route TEXT NOT NULL,
+    model TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    first_token_s REAL,
+    ok INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_route ON llm_calls (route, finished_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_name ON events (name, at);
+CREATE TABLE IF NOT EXISTS docs_builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usecase TEXT,
+    mode TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    seconds REAL NOT NULL,
+    ok INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_docs_builds_usecase ON docs_builds (usecase, started_at);
+"""
+
+# Columns added after the first release; older databases are migrated in place
+_ADDED_COLUMNS = {
+    "input_tokens": "INTEGER",
+    "output_tokens": "INTEGER",
+    "cache_read_tokens": "INTEGER",
+    "cache_write_tokens": "INTEGER",
+}
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the run history database, creating the schema on first use."""
+    global _initialized
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _initialized:
+        with _init_lock:
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            _initialized = True
+    return conn
+
+
+def record_run(job) -> None:
+    """Persist a finished job from the job engine."""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO runs (job_id, command, usecase, state, exit_code, created_at, started_at, finished_at, output_bytes, ran_process, "
+                "input_tokens, output_tokens, cache_read_tokens, cache_write_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.name, job.usecase, job.state, job.return_code, job.created_at,
+                    job.started_at, job.finished_at, job.log_offset, 1 if job.ran_process else 0,
+                    job.metrics.get("input_tokens"), job.metrics.get("output_tokens"),
+                    job.metrics.get("cache_read_tokens"), job.metrics.get("cache_write_tokens"),
+                ),
+            )
+    finally:
+        conn.close()
+
+
+def record_llm_call(route, model, started_at, finished_at, first_token_s=None, ok=True) -> None:
+    """Persist the latency of one onboarding LLM call."""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO llm_calls (route, model, started_at, finished_at, first_token_s, ok) VALUES (?, ?, ?, ?, ?, ?)",
+                (route, model, started_at, finished_at, first_token_s, 1 if ok else 0),
+            )
+    finally:
+        conn.close()
+
+
+def record_event(name: str) -> None:
+    """Count one occurrence of ``name`` (e.g. an extraction outcome); errors are logged, not raised."""
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO events (name, at) VALUES (?, ?)", (name, time.time()))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Failed to record event {name}: {e}")
+
+
+def event_counts(since=None) -> dict:
+    """Occurrences per event name."""
+    query = "SELECT name, COUNT(*) AS n FROM events"
+    params = []
+    if since:
+        query += " WHERE at >= ?"
+        params.append(since)
+    query += " GROUP BY name"
+    conn = _connect()
+    try:
+        return {row["name"]: row["n"] for row in conn.execute(query, params)}
+    finally:
+        conn.close()
+
+
+def record_docs_build(usecase, mode, started_at, seconds, ok=True) -> None:
+    """Persist the timing of one documentation build (``mode`` is "skipped" for up-to-date sites)."""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO docs_builds (usecase, mode, started_at, seconds, ok) VALUES (?, ?, ?, ?, ?)",
+                (usecase, mode, started_at, seconds, 1 if ok else 0),
+            )
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values, pct: float):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def artifact_stats(usecase=None, since=None):
+    """Per-command run counts, failure rate and p50/p95/p99 duration in seconds.
+
+    Durations only include runs that actually started a backend process;
+    cache hits are counted separately.
+    """
+    query = (
+        "SELECT command, state, ran_process, started_at, finished_at, output_bytes, "
+        "cache_read_tokens, cache_write_tokens FROM runs WHERE 1=1"
+    )
+    params = []
+    if usecase:
+        query += " AND usecase = ?"
+        params.append(usecase)
+    if since:
+        query += " AND finished_at >= ?"
+        params.append(since)
+    conn = _connect()
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    grouped = {}
+    for row in rows:
+        stats = grouped.setdefault(row["command"], {
+            "runs": 0, "failures": 0, "cache_hits": 0, "durations": [], "output_bytes": 0,
+            "cache_read_tokens": 0, "cache_write_tokens": 0,
+        })
+        stats["runs"] += 1
+        if not row["ran_process"] and row["state"] == "succeeded":
+            stats["cache_hits"] += 1
+            continue
+        if row["state"] != "succeeded":
+            stats["failures"] += 1
+        if row["started_at"] and row["finished_at"]:
+            stats["durations"].append(row["finished_at"] - row["started_at"])
+        stats["output_bytes"] += row["output_bytes"] or 0
+        stats["cache_read_tokens"] += row["cache_read_tokens"] or 0
+        stats["cache_write_tokens"] += row["cache_write_tokens"] or 0
+
+    result = []
+    for command, stats in sorted(grouped.items()):
+        durations = sorted(stats["durations"])
+        executed = stats["runs"] - stats["cache_hits"]
+        result.append({
+            "command": command,
+            "runs": stats["runs"],
+            "cache_hits": stats["cache_hits"],
+            "failures": stats["failures"],
+            "failure_rate": (stats["failures"] / executed) if executed else 0.0,
+            "p50_s": percentile(durations, 50),
+            "p95_s": percentile(durations, 95),
+            "p99_s": percentile(durations, 99),
+            "avg_output_bytes": int(stats["output_bytes"] / executed) if executed else 0,
+            "cache_read_tokens": stats["cache_read_tokens"],
+            "cache_write_tokens": stats["cache_write_tokens"],
+        })
+    return result
+
+
+def recent_runs(limit=100, usecase=None, since=None):
+    """Most recent runs, newest first."""
+    query = "SELECT * FROM runs WHERE 1=1"
+    params = []
+    if usecase:
+        query += " AND usecase = ?"
+        params.append(usecase)
+    if since:
+        query += " AND finished_at >= ?"
+        params.append(since)
+    query += " ORDER BY finished_at DESC LIMIT ?"
+    params.append(limit)
+    conn = _connect()
+    try:
+        return [dict(r) for r in conn.execute(query, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def route_stats(since=None):
+    """Per route and model call counts, error rate and p50/p95 latency in seconds."""
+    query = "SELECT route, model, started_at, finished_at, first_token_s, ok FROM llm_calls"
+    params = []
+    if since:
+        query += " WHERE finished_at >= ?"
+        params.append(since)
+    conn = _connect()
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    grouped = {}
+    for row in rows:
+        stats = grouped.setdefault((row["route"], row["model"]), {"calls": 0, "errors": 0, "durations": [], "ttfts": []})
+        stats["calls"] += 1
+        if not row["ok"]:
+            stats["errors"] += 1
+            continue
+        stats["durations"].append(row["finished_at"] - row["started_at"])
+        if row["first_token_s"] is not None:
+            stats["ttfts"].append(row["first_token_s"])
+
+    result = []
+    for (route, model), stats in sorted(grouped.items()):
+        durations = sorted(stats["durations"])
+        ttfts = sorted(stats["ttfts"])
+        result.append({
+            "route": route,
+            "model": model,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "p50_s": percentile(durations, 50),
+            "p95_s": percentile(durations, 95),
+            "ttft_p50_s": percentile(ttfts, 50),
+        })
+    return result
+
+
+def docs_build_stats(usecase=None, since=None):
+    """Per build mode counts, failures and p50/p95 duration in seconds."""
+    query = "SELECT mode, seconds, ok FROM docs_builds WHERE 1=1"
+    params = []
+    if usecase:
+        query += " AND usecase = ?"
+        params.append(usecase)
+    if since:
+        query += " AND started_at >= ?"
+        params.append(since)
+    conn = _connect()
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    grouped = {}
+    for row in rows:
+        stats = grouped.setdefault(row["mode"], {"builds": 0, "failures": 0, "durations": []})
+        stats["builds"] += 1
+        if not row["ok"]:
+            stats["failures"] += 1
+        stats["durations"].append(row["seconds"])
+
+    result = []
+    for mode, stats in sorted(grouped.items()):
+        durations = sorted(stats["durations"])
+        result.append({
+            "mode": mode,
+            "builds": stats["builds"],
+            "failures": stats["failures"],
+            "p50_s": percentile(durations, 50),
+            "p95_s": percentile(durations, 95),
+        })
+    return result
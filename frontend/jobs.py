@@ -0,0 +1,340 @@
+import os
+import signal
+import logging
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import settings
+import history
+from governor import get_admission_controller
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+LOG_DIR = os.path.join(settings.STATE_DIR, "logs")
+
+
+class Job:
+    """A single background command run tracked in the process-wide job table."""
+
+    def __init__(self, name, usecase, command, cwd="../", on_complete=None, runner=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.usecase = usecase
+        self.command = command
+        self.cwd = cwd
+        self.state = QUEUED
+        self.return_code = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.metrics = {}  # backend-reported figures, e.g. token usage
+        self.log_path = os.path.join(LOG_DIR, f"{self.id}.log")
+        self._log_file = None
+        self._log_size = 0
+        self._tail = deque(maxlen=settings.JOB_LOG_TAIL_LINES)
+        self._lock = threading.Lock()
+        self._process = None
+        self._runner = runner
+        self._executed = False
+        self._on_cancel = None
+        self._cancel_requested = False
+        self._on_complete = list(on_complete or [])
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def ran_process(self) -> bool:
+        """False for jobs that finished without invoking the backend (e.g. cache hits)."""
+        return self._executed
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested
+
+    def set_cancel_hook(self, hook) -> None:
+        """Register a callable that aborts in-process work when the job is cancelled."""
+        self._on_cancel = hook
+
+    @property
+    def log_offset(self) -> int:
+        """Number of log bytes spooled to disk so far."""
+        return self._log_size
+
+    def append_log(self, text: str) -> None:
+        """Spool ``text`` to the job's log file and keep it in the in-memory tail."""
+        data = text.encode("utf-8")
+        with self._lock:
+            if self._log_file is None:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                self._log_file = open(self.log_path, "ab")
+            self._log_file.write(data)
+            self._log_file.flush()
+            self._log_size += len(data)
+            self._tail.append(text)
+
+    def close_log(self) -> None:
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def tail(self):
+        """Return (recent_text, offset) so a new viewer can start from the visible tail."""
+        with self._lock:
+            return "".join(self._tail), self._log_size
+
+    def read_log(self, offset: int = 0, max_bytes: int = settings.JOB_LOG_READ_BYTES):
+        """Return (new_text, new_offset) for output written after byte ``offset``.
+
+        At most ``max_bytes`` are read; a viewer that fell further behind skips
+        ahead, since only the visible tail is rendered.
+        """
+        with self._lock:
+            end = self._log_size
+        if offset >= end:
+            return "", offset
+        offset = max(offset, end - max_bytes)
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(end - offset)
+        return data.decode("utf-8", errors="replace"), end
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "usecase": self.usecase,
+            "state": self.state,
+            "return_code": self.return_code,
+            "log_offset": self.log_offset,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Bounded worker pool plus a job table shared by every Streamlit session."""
+
+    def __init__(self, max_workers: int = settings.JOB_WORKERS, history_limit: int = settings.JOB_HISTORY_LIMIT):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pilot-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._history_limit = history_limit
+
+    # --- Job table ---
+    def submit(self, name, usecase, command, cwd="../", on_complete=None, runner=None) -> Job:
+        """Queue ``command`` for execution and return its job handle.
+
+        By default ``command`` runs as a shell command. A ``runner(job)`` callable
+        replaces the subprocess (e.g. an in-process SDK generation); it returns
+        the exit code and writes its output through ``job.append_log``.
+        """
+        job = Job(name, usecase, command, cwd=cwd, on_complete=on_complete, runner=runner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune_locked()
+        logging.info(f"Queued job {job.id}: {name} on use case: {usecase}")
+        self._executor.submit(self._run, job)
+        return job
+
+    def add_finished(self, name, usecase, command, log_text, return_code=0, on_complete=None) -> Job:
+        """Record a job that completed without running a process (e.g. a cache hit)."""
+        job = Job(name, usecase, command, on_complete=on_complete)
+        job.append_log(log_text)
+        job.started_at = job.created_at
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune_locked()
+        self._finish(job, return_code)
+        return job
+
+    def get(self, job_id):
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, usecase=None, active_only=False):
+        """Return jobs (newest first), optionally filtered by use case and activity."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if usecase is not None:
+            jobs = [j for j in jobs if j.usecase == usecase]
+        if active_only:
+            jobs = [j for j in jobs if j.is_active]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def find_active(self, usecase, name):
+        """Return the running or queued job for (usecase, name), if any."""
+        for job in self.list_jobs(usecase=usecase, active_only=True):
+            if job.name == name:
+                return job
+        return None
+
+    def cancel(self, job_id) -> bool:
+        """Request cancellation; kills the process group if the job already started."""
+        job = self.get(job_id)
+        if not job or not job.is_active:
+            return False
+        job._cancel_requested = True
+        get_admission_controller().wake()
+        if job._on_cancel is not None:
+            try:
+                job._on_cancel()
+            except Exception as e:
+                logging.error(f"Cancel hook failed for job {job.id}: {e}")
+        proc = job._process
+        if proc is not None:
+            _terminate(proc)
+        logging.info(f"Cancellation requested for job {job.id}: {job.name}")
+        return True
+
+    def queue_position(self, job_id):
+        """1-based position of a queued job among everything waiting for a backend slot."""
+        job = self.get(job_id)
+        if not job or job.state != QUEUED:
+            return None
+        governor = get_admission_controller()
+        position = governor.position(job.id)
+        if position is not None:
+            return position
+        # Not yet picked up by a worker: it waits behind the admission queue
+        backlog = [
+            j for j in self.list_jobs(active_only=True)
+            if j.state == QUEUED and governor.position(j.id) is None
+        ]
+        backlog.sort(key=lambda j: j.created_at)
+        return governor.snapshot()["waiting"] + backlog.index(job) + 1
+
+    def _prune_locked(self) -> None:
+        finished = [j for j in self._jobs.values() if not j.is_active]
+        excess = len(self._jobs) - self._history_limit
+        if excess <= 0:
+            return
+        finished.sort(key=lambda j: j.created_at)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
+            try:
+                os.remove(job.log_path)
+            except OSError:
+                pass
+
+    # --- Execution ---
+    def _run(self, job: Job) -> None:
+        # Wait for a backend slot; requests over the limit queue here in FIFO order
+        governor = get_admission_controller()
+        if not governor.acquire(job.id, cancelled=lambda: job._cancel_requested):
+            self._finish(job, None)
+            return
+        job.started_at = time.time()
+        job.state = RUNNING
+        try:
+            self._execute(job)
+        finally:
+            governor.release()
+
+    def _execute(self, job: Job) -> None:
+        if job._cancel_requested:
+            # Cancelled while waiting for the backend slot
+            self._finish(job, None)
+            return
+        job._executed = True
+        if job._runner is not None:
+            try:
+                return_code = job._runner(job)
+            except Exception as e:
+                logging.error(f"Error in job {job.id}: {e}")
+                job.append_log(f"{e}\n")
+                return_code = 1
+            self._finish(job, return_code)
+            return
+
+        try:
+            proc = subprocess.Popen(
+                job.command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, cwd=job.cwd, bufsize=1, universal_newlines=True, preexec_fn=os.setsid
+            )
+        except Exception as e:
+            logging.error(f"Failed to start job {job.id}: {e}")
+            job.append_log(f"{e}\n")
+            self._finish(job, 1)
+            return
+
+        job._process = proc
+        if job._cancel_requested:
+            # A cancel() between the checks above and _process being set found nothing to kill
+            _terminate(proc)
+        try:
+            for line in iter(proc.stdout.readline, ''):
+                # Log the output to the console
+                line_without_newline = line.strip()
+                if line_without_newline:
+                    logging.info(line_without_newline)
+                job.append_log(line)
+            proc.stdout.close()
+            return_code = proc.wait()
+        except Exception as e:
+            logging.error(f"Error in job {job.id}: {e}")
+            job.append_log(f"{e}\n")
+            # Do not leave the backend process running (or unreaped) without its job
+            _terminate(proc)
+            proc.wait()
+            return_code = 1
+        self._finish(job, return_code)
+
+    def _finish(self, job: Job, return_code) -> None:
+        job.close_log()
+        job.return_code = return_code
+        job.finished_at = time.time()
+        if job._cancel_requested:
+            job.state = CANCELLED
+        elif return_code == 0:
+            job.state = SUCCEEDED
+        else:
+            job.state = FAILED
+        logging.info(f"Job {job.id} ({job.name}) finished: {job.state} (exit code {return_code})")
+        try:
+            history.record_run(job)
+        except Exception as e:
+            logging.error(f"Failed to record run history for job {job.id}: {e}")
+        for callback in job._on_complete:
+            try:
+                callback(job)
+            except Exception as e:
+                logging.error(f"Completion hook failed for job {job.id}: {e}")
+
+
+def _terminate(proc) -> None:
+    """Send SIGTERM to a backend process's group if it is still running."""
+    if proc.poll() is None:
+        try:
+            os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -3,9 +3,6 @@ import os
 import subprocess
 import re
 from streamlit_mermaid import st_mermaid
-import signal
-import queue
-import threading
 import time
 import streamlit_shadcn_ui as ui
 import logging
@@ -13,6 +10,16 @@ from azure.devops.connection import Connection
 from msrest.authentication import BasicAuthentication
 from ado import load_stories_from_json
 from ui import apply_compact_styles
+import settings
+from jobs import get_job_manager, QUEUED, SUCCEEDED, CANCELLED
+from commands import load_commands, Command
+from generation import submit_generation
+from docs_toolchain import ensure_docs_toolchain, toolchain_ready
+from docs_build import build_docs
+from docs_server import docs_url, export_url, docs_server_error
+from docs_preview import get_preview_registry
+from catalog import get_catalog
+from version_store import get_version_store, format_version, describe_version, describe_current
 
 
 st.set_page_config(
@@ -29,18 +36,12 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 # --- Session State Initialization ---
-if 'usecase_ports' not in st.session_state:
-    st.session_state.usecase_ports = {}
-if 'running_servers' not in st.session_state:
-    st.session_state.running_servers = {} # port -> process
-if 'next_port' not in st.session_state:
-    st.session_state.next_port = 8005
 if 'selected_usecase_index' not in st.session_state:
     st.session_state.selected_usecase_index = 0
 if 'selected_usecase' not in st.session_state:
     st.session_state.selected_usecase = None
-if 'current_process' not in st.session_state:
-    st.session_state.current_process = None
+if 'command_job_id' not in st.session_state:
+    st.session_state.command_job_id = None
 if 'last_generation_status' not in st.session_state:
     st.session_state.last_generation_status = None
 
@@ -79,155 +80,177 @@ def get_claude_cli_status():
     return False, None
 
 
-def run_command_in_thread(process, q):
+def _attach_job(job):
+    """Point this session's progress view at ``job`` from the shared job table."""
+    st.session_state.command_is_running = True
+    st.session_state.command_job_id = job.id
+    # Only the visible tail of the run log is kept in the session; the full log is spooled to job.log_path
+    tail, offset = job.tail()
+    st.session_state.command_log = f"$ Go get a coffee while the sentient toasters work their magic\n" + tail
+    st.session_state.command_log_offset = offset
+    st.session_state.command_return_code = None
+    st.session_state.selected_command_name_running = job.name
+    st.session_state.usecase_path_running = os.path.join("../workspace", job.usecase)
+
+
+def _prepare_docs(ra_path, usecase):
+    """Check the docs toolchain and build the site if its sources changed; reports and returns the error, or None."""
+    # Check documentation dependencies (once per process; installs only what is missing)
+    if not toolchain_ready():
+        with st.spinner("Checking documentation dependencies..."):
+            toolchain_ok, toolchain_error = ensure_docs_toolchain()
+        if not toolchain_ok:
+            st.error("Failed to install dependencies:")
+            st.code(toolchain_error)
+            return f"Failed to install dependencies: {toolchain_error}"
+
+    # Build docs (skipped when the _ra sources are unchanged since the last build)
+    with st.spinner("Building documentation..."):
+        build = build_docs(ra_path, usecase=usecase)
+        if not build.ok:
+            st.error("Failed to build documentation:")
+            st.code(build.output)
+            return f"Failed to build documentation: {build.output[-2000:]}"
+        if not build.built:
+            st.caption("Documentation is up to date; build skipped.")
+    return None
+
+def start_docs_server(usecase_path):
+    """Build the use case's documentation and publish it on the shared docs server.
+
+    Returns (url, error): the documentation URL, or None and why publishing failed.
+    """
+    ra_path = os.path.join(usecase_path, '_ra')
+    if not os.path.isdir(ra_path):
+        error = f"Directory not found: {ra_path}. Cannot start documentation server."
+        st.error(error)
+        return None, error
+
     try:
-        for line in iter(process.stdout.readline, ''):
-            # Log the output to the console
-            line_without_newline = line.strip()
-            if line_without_newline:
-                logging.info(line_without_newline)
-            q.put(line)
-        process.stdout.close()
-        return_code = process.wait()
-        q.put(f"---RC:{return_code}---")
+        usecase = os.path.basename(os.path.normpath(usecase_path))
+        error = _prepare_docs(ra_path, usecase)
+        if error:
+            return None, error
+        url = docs_url(usecase)
+        if url is None:
+            st.error(docs_server_error())
+            return None, docs_server_error()
+        st.success("Documentation published.")
+
+        # Centered button to view docs
+        _, col, _ = st.columns([1, 2, 1])
+        with col:
+            st.link_button("View Documentation", url=url, use_container_width=True)
+        return url, None
+
     except Exception as e:
-        logging.error(f"Error in command thread: {e}")
-        q.put(str(e))
-        q.put("---RC:1---")
-
-
-def start_docs_server(usecase_path, port):
-    # Kill any existing server on this specific port
-    if port in st.session_state.running_servers:
-        proc = st.session_state.running_servers[port]
-        if proc.poll() is None:
-            st.warning(f"Stopping previous documentation server (PID: {proc.pid}) on port {port}...")
-            try:
-                os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
-                proc.wait()
-            except ProcessLookupError:
-                pass  # Process already dead
-            finally:
-                if port in st.session_state.running_servers:
-                    del st.session_state.running_servers[port]
-    
-    # Give the OS a moment to release the port
-    time.sleep(2)
+        error = f"An error occurred while setting up the documentation server: {e}"
+        st.error(error)
+        return None, error
+
+def start_live_preview(usecase_path):
+    """Run ``mkdocs serve`` (live reload) for authors editing the ``_ra`` sources.
 
+    Previews live in the process-wide registry, so every session shares one
+    server per use case and the reaper stops it once nobody uses it.
+    """
     ra_path = os.path.join(usecase_path, '_ra')
     if not os.path.isdir(ra_path):
-        st.error(f"Directory not found: {ra_path}. Cannot start documentation server.")
+        st.error(f"Directory not found: {ra_path}. Cannot start live preview.")
         return
 
     try:
-        # Step 1: Install documentation dependencies
-        with st.spinner("Installing documentation dependencies..."):
-            install_process = subprocess.run(
-                [
-                    "pip", "install",
-                    "mkdocs>=1.5.0",
-                    "mkdocs-material>=9.0.0",
-                    "mkdocs-mermaid2-plugin>=1.0.0",
-                    "pymdown-extensions>=10.0.0",
-                    "mkdocs-awesome-pages-plugin>=2.8.0",
-                    "mkdocs-minify-plugin>=0.7.0",
-                    "mkdocs-git-revision-date-localized-plugin>=1.2.0"
-                ],
-                cwd=ra_path,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            if install_process.returncode != 0:
+        if not toolchain_ready():
+            with st.spinner("Checking documentation dependencies..."):
+                toolchain_ok, toolchain_error = ensure_docs_toolchain()
+            if not toolchain_ok:
                 st.error("Failed to install dependencies:")
-                st.code(install_process.stderr)
+                st.code(toolchain_error)
                 return
 
-        # Step 2: Build docs
-        with st.spinner("Building documentation..."):
-            build_process = subprocess.run(
-                ["mkdocs", "build", "--clean"],
-                cwd=ra_path,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            if build_process.returncode != 0:
-                st.error("Failed to build documentation:")
-                st.code(build_process.stderr)
-                return
-        
-        # Step 3: Serve docs
-        with st.spinner(f"Starting documentation server on port {port}..."):
-            proc = subprocess.Popen(
-                ["mkdocs", "serve", f"--dev-addr=127.0.0.1:{port}"],
-                cwd=ra_path,
-                preexec_fn=os.setsid
-            )
-            st.session_state.running_servers[port] = proc
-            st.success("Documentation server started.")
-            
-            # Centered button to view docs
-            _, col, _ = st.columns([1, 2, 1])
-            with col:
-                st.link_button("View Documentation", url=f"http://localhost:{port}", use_container_width=True)
+        with st.spinner("Starting live preview..."):
+            server = get_preview_registry().start(os.path.basename(usecase_path), ra_path)
+            st.success(f"Live preview started on port {server.port}.")
 
     except Exception as e:
-        st.error(f"An error occurred while setting up the documentation server: {e}")
+        st.error(f"An error occurred while starting the live preview: {e}")
 
-@st.fragment
+@st.fragment(run_every=settings.PROGRESS_REFRESH_SECONDS)
 def show_generation_progress():
-    with st.status(f"Running artifact generation: `{st.session_state.selected_command_name_running}` on `{st.session_state.selected_usecase}`...", expanded=True) as status:
-        log_placeholder = st.empty()
-
-        # Loop to update the log
-        while st.session_state.get('command_is_running'):
-            while not st.session_state.command_q.empty():
-                line = st.session_state.command_q.get_nowait()
-                if line.startswith("---RC:"):
-                    st.session_state.command_return_code = int(line.replace("---RC:", "").replace("---", ""))
-                    st.session_state.command_is_running = False
-                    st.session_state.current_process = None
-                    break
-                st.session_state.command_log += line
-            
-            log_placeholder.code(st.session_state.command_log)
-            
-            if not st.session_state.get('command_is_running'):
-                # Command has just finished
-                if st.session_state.command_return_code == 0:
-                    # Post-run actions: if it was a doc generation, start the server.
-                    if "documentation" in st.session_state.selected_command_name_running.lower():
-                        status.update(label="Documentation generated!", state="complete", expanded=False)
-                        logging.info("Documentation generation successful.")
-                        st.success("Documentation generation complete. Starting server...")
-                        running_usecase_path = st.session_state.usecase_path_running
-                        if running_usecase_path not in st.session_state.usecase_ports:
-                            st.session_state.usecase_ports[running_usecase_path] = st.session_state.next_port
-                            st.session_state.next_port += 1
-                        port_to_start = st.session_state.usecase_ports[running_usecase_path]
-                        start_docs_server(running_usecase_path, port_to_start)
-                    else:
-                        status.update(label="Artifact generation complete!", state="complete", expanded=False)
-                        logging.info(f"Artifact generation successful: {st.session_state.selected_command_name_running}")
-                        st.session_state.last_generation_status = {"status": "success", "message": "Artifact generation complete!"}
+    # Timer-driven: each tick renders only the new output and returns, so no
+    # script thread is held for the lifetime of the job.
+    job = get_job_manager().get(st.session_state.get('command_job_id'))
+    if job is None:
+        st.session_state.command_is_running = False
+        st.rerun()
+
+    # Check for completion before reading so the final output is never missed
+    finished = not job.is_active
+    new_text, st.session_state.command_log_offset = job.read_log(st.session_state.command_log_offset)
+    if new_text:
+        st.session_state.command_log = (st.session_state.command_log + new_text)[-settings.LOG_VIEW_CHARS:]
+
+    running_label = f"Running artifact generation: `{st.session_state.selected_command_name_running}` on `{st.session_state.selected_usecase}`..."
+    if not finished:
+        with st.status(running_label, expanded=True):
+            if st.button("⏹ Cancel generation", key=f"cancel_{job.id}"):
+                get_job_manager().cancel(job.id)
+            if job.state == QUEUED:
+                position = get_job_manager().queue_position(job.id)
+                st.info(f"⏳ The backend is busy. Your request is queued at position {position or '?'}.")
+            st.code(st.session_state.command_log)
+        return
 
+    # Command has just finished
+    st.session_state.command_return_code = job.return_code
+    st.session_state.command_is_running = False
+    with st.status(running_label, expanded=False) as status:
+        st.code(st.session_state.command_log)
+        if job.state == SUCCEEDED:
+            # Post-run actions: if it was a doc generation, start the server.
+            if "documentation" in st.session_state.selected_command_name_running.lower():
+                status.update(label="Documentation generated!", state="complete", expanded=False)
+                logging.info("Documentation generation successful.")
+                st.success("Documentation generation complete. Starting server...")
+                url, error = start_docs_server(st.session_state.usecase_path_running)
+                # The rerun below clears what start_docs_server rendered; keep its outcome for the next run
+                if error:
+                    st.session_state.last_generation_status = {
+                        "status": "error", "message": f"Documentation generated, but publishing it failed: {error}"
+                    }
                 else:
-                    status.update(label="Artifact Generation failed!", state="error")
-                    logging.error(f"Artifact Generation failed!: {st.session_state.selected_command_name_running} with exit code {st.session_state.command_return_code}")
-                    st.session_state.last_generation_status = {"status": "error", "message": f"Artifact Generation failed with exit code: {st.session_state.command_return_code}"}
-
-                # Rerun one last time to clear the spinner
-                st.session_state.current_process = None
-                
+                    st.session_state.last_generation_status = {
+                        "status": "success", "message": f"Documentation generated and published at {url}"
+                    }
             else:
-                time.sleep(1) # The fragment will re-run itself, not the whole app
+                status.update(label="Artifact generation complete!", state="complete", expanded=False)
+                logging.info(f"Artifact generation successful: {st.session_state.selected_command_name_running}")
+                st.session_state.last_generation_status = {"status": "success", "message": "Artifact generation complete!"}
+
+        elif job.state == CANCELLED:
+            status.update(label="Artifact generation cancelled.", state="error")
+            st.session_state.last_generation_status = {"status": "error", "message": "Artifact generation was cancelled."}
+
+        else:
+            status.update(label="Artifact Generation failed!", state="error")
+            logging.error(f"Artifact Generation failed!: {st.session_state.selected_command_name_running} with exit code {st.session_state.command_return_code}")
+            st.session_state.last_generation_status = {"status": "error", "message": f"Artifact Generation failed with exit code: {st.session_state.command_return_code}"}
+
+    # Detach from the finished job and rerun once to stop the refresh timer
+    st.session_state.command_job_id = None
+    st.rerun()
 
 st.title("PILOT")
 st.caption("Product Innovation & Lifecycle Orchestration Tool")
 
 if st.session_state.get('selected_usecase'):
     st.caption(f"Selected Use Case: `{st.session_state.get('selected_usecase')}`")
+
+    # Re-attach to a generation still running for this use case (e.g. after a reconnect or from another tab)
+    if not st.session_state.get('command_is_running'):
+        active_jobs = get_job_manager().list_jobs(usecase=st.session_state.selected_usecase, active_only=True)
+        if active_jobs:
+            _attach_job(active_jobs[0])
  
 # Claude CLI status indicator
 cli_ok, cli_version = get_claude_cli_status()
@@ -242,8 +265,8 @@ if st.session_state.get('selected_usecase'):
     tab_options.extend(["Product Planning", "Results", "Azure DevOps"])
 
 # Determine default tab
-if st.session_state.get('command_is_running'):
-    # Command is running, default to Product Planning tab
+if st.session_state.get('command_is_running') or st.session_state.get('last_generation_status'):
+    # Command is running or just finished, default to Product Planning tab
     default_tab = "Product Planning"
 else:
     default_tab = "Product Use Case"
@@ -283,6 +306,7 @@ if selected_tab == "Product Use Case":
                     md_path = os.path.join(uc_dir, "usecase.md")
                     with open(md_path, 'w', encoding='utf-8') as f:
                         f.write(f"# {use_case_name}\n\n{use_case_desc}\n")
+                    get_catalog().refresh_project(slug)
 
                     # Mirror clone flow for use cases: set as selected and index
                     st.session_state.selected_usecase = slug
@@ -368,6 +392,7 @@ if selected_tab == "Product Use Case":
                                             # Save the updated content
                                             with open(usecase_md_path, 'w', encoding='utf-8') as f:
                                                 f.write(f"# {updated_name}\n\n{updated_description}\n")
+                                            get_catalog().refresh_project(st.session_state.get('selected_usecase'))
                                             st.session_state[edit_key] = False
                                             st.session_state.use_case_saved_message = "Use case updated successfully!"
                                             st.rerun()
@@ -408,20 +433,9 @@ elif selected_tab == "Product Planning":
         # Load commands from commands.md and replace $USECASE
         command_map = {}
         try:
-            with open("commands.md", 'r', encoding='utf-8') as f:
-                relative_usecase_path = os.path.join("workspace", selected_usecase) + os.sep
-                for line in f:
-                    if line.strip():
-                        parts = [p.strip() for p in line.strip().split(',', 2)]
-                        if len(parts) >= 2:
-                            name = parts[0]
-                            command_template = parts[1]
-                            output_file = parts[2] if len(parts) > 2 else None
-                            command = command_template.replace("$USECASE", relative_usecase_path)
-                            command_map[name] = (command, output_file)
-
+            command_map = load_commands(selected_usecase)
         except FileNotFoundError:
-            command_map["Error"] = ("echo 'commands.md not found'", None)
+            command_map["Error"] = Command("Error", "echo 'commands.md not found'", None)
         
         if not command_map:
             st.warning("No valid commands found in commands.md.")
@@ -429,20 +443,34 @@ elif selected_tab == "Product Planning":
             # Hide controls when a command is running
             if not st.session_state.get('command_is_running'):
                 selected_command_name = st.selectbox("Select an artifact to generate", list(command_map.keys()))
+                force_regenerate = st.checkbox(
+                    "Force regeneration (bypass cache)", value=False,
+                    help="Identical inputs are normally restored from the generation cache instead of re-running the backend."
+                )
                 run_button = st.button("Generate Product Artifacts")
 
-                # Check if docs server is already running for this usecase
-                usecase_port = st.session_state.usecase_ports.get(usecase_path)
-                if usecase_port and usecase_port in st.session_state.running_servers and st.session_state.running_servers[usecase_port].poll() is None:
-                    st.success("Documentation server is running.")
+                # Built documentation is served by the shared docs server; mkdocs serve is only a live preview
+                if os.path.isfile(os.path.join(usecase_path, '_ra', 'site', 'index.html')):
                     _, col, _ = st.columns([1, 2, 1])
                     with col:
-                        st.link_button("View Documentation", url=f"http://localhost:{usecase_port}", use_container_width=True)
+                        if docs_url(selected_usecase) is None:
+                            st.warning(docs_server_error())
+                        else:
+                            st.link_button("View Documentation", url=docs_url(selected_usecase), use_container_width=True)
+                            st.link_button("⬇ Download Static Export", url=export_url(selected_usecase), use_container_width=True,
+                                           help="Built site with pre-compressed .gz assets and a hashed asset manifest, for any static server")
+                        preview = get_preview_registry().get(selected_usecase)
+                        if preview is not None:
+                            st.link_button("Open Live Preview", url=preview.url, use_container_width=True)
+                        elif st.button("▶ Start Live Preview (mkdocs serve)", use_container_width=True,
+                                       help="Rebuilds on every edit of the _ra sources; only needed while authoring"):
+                            start_live_preview(usecase_path)
+                            st.rerun()
 
                 # Check for "Generate New Version" button click (independent of run_button)
                 generate_new_version = False
                 if selected_command_name:
-                    command_to_run, output_file = command_map[selected_command_name]
+                    command_to_run, output_file = command_map[selected_command_name].command, command_map[selected_command_name].output_file
                     if output_file:
                         report_file_path = os.path.join(usecase_path, output_file)
                         if os.path.exists(report_file_path):
@@ -451,7 +479,7 @@ elif selected_tab == "Product Planning":
 
                 # Handle both regular generation and new version generation
                 if (run_button and selected_command_name) or generate_new_version:
-                    command_to_run, output_file = command_map[selected_command_name]
+                    command_to_run, output_file = command_map[selected_command_name].command, command_map[selected_command_name].output_file
 
                     should_run_command = True
                     if output_file:
@@ -464,17 +492,10 @@ elif selected_tab == "Product Planning":
                                 should_run_command = False
                             else:
                                 # Handle versioning for "Generate New Version" button
-                                import datetime
-                                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                                base_name = output_file.replace('.md', '')
-                                versioned_name = f"{base_name}_v{timestamp}.md"
-                                versioned_path = os.path.join(usecase_path, versioned_name)
-                                
                                 try:
-                                    # Move existing report to versioned name
-                                    import shutil
-                                    shutil.move(report_file_path, versioned_path)
-                                    st.success(f"✅ Existing report backed up as '{versioned_name}'. Generating new version...")
+                                    # Save the existing report in the version store
+                                    version = get_version_store(usecase_path).archive(output_file)
+                                    st.success(f"✅ Existing report saved as version {version}. Generating new version...")
                                     should_run_command = True
                                 except Exception as e:
                                     st.error(f"❌ Failed to backup existing report: {e}")
@@ -486,49 +507,20 @@ elif selected_tab == "Product Planning":
                     if should_run_command:
                         logging.info(f"Starting generating artifact: {selected_command_name} on use case: {selected_usecase}")
 
-                        # --- Start command execution state ---
-                        st.session_state.command_is_running = True
-                        st.session_state.command_log = f"$ Go get a coffee while the sentient toasters work their magic\n"
-                        st.session_state.command_q = queue.Queue()
-                        st.session_state.command_return_code = None
-                        st.session_state.selected_command_name_running = selected_command_name
-                        st.session_state.usecase_path_running = usecase_path
-
                         # This logic handles "re-running" the docs server.
                         # It also handles the case where the command *generates* the docs for the first time.
                         if "documentation" in selected_command_name.lower():
                             ra_path = os.path.join(usecase_path, '_ra')
                             if os.path.isdir(ra_path):
-                                st.info("Starting/Restarting documentation server...")
-                                # Assign a port to the repo if it doesn't have one
-                                if usecase_path not in st.session_state.usecase_ports:
-                                    st.session_state.usecase_ports[usecase_path] = st.session_state.next_port
-                                    st.session_state.next_port += 1
-                                usecase_port = st.session_state.usecase_ports[usecase_path]
-                                start_docs_server(usecase_path, usecase_port)
+                                st.info("Publishing documentation...")
+                                start_docs_server(usecase_path)
                                 st.session_state.command_is_running = False # It's not a long-running fg task
                             else:
                                 # Run the command to generate the docs first
                                 st.info("Documentation not generated yet. Running generation command...")
-                                process = subprocess.Popen(
-                                    command_to_run, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                    text=True, cwd='../', bufsize=1, universal_newlines=True, preexec_fn=os.setsid
-                                )
-                                st.session_state.current_process = process
-                                thread = threading.Thread(target=run_command_in_thread, args=(process, st.session_state.command_q))
-                                thread.daemon = True
-                                thread.start()
-                                st.session_state.command_thread = thread
+                                _attach_job(submit_generation(command_map[selected_command_name], selected_usecase, force=force_regenerate))
                         else:
-                            process = subprocess.Popen(
-                                command_to_run, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                text=True, cwd='../', bufsize=1, universal_newlines=True, preexec_fn=os.setsid
-                            )
-                            st.session_state.current_process = process
-                            thread = threading.Thread(target=run_command_in_thread, args=(process, st.session_state.command_q))
-                            thread.daemon = True
-                            thread.start()
-                            st.session_state.command_thread = thread
+                            _attach_job(submit_generation(command_map[selected_command_name], selected_usecase, force=force_regenerate))
 
         # This block will now handle rendering the logs for a running command
         if st.session_state.get('command_is_running'):
@@ -560,19 +552,17 @@ elif selected_tab == "Results":
         file_to_report_map = dict(zip(allowed_md_files, report_names))
         report_to_file_map = dict(zip(report_names, allowed_md_files))
         
-        # Get all markdown files including versioned ones
-        all_files = os.listdir(usecase_path)
-        current_reports = [f for f in all_files if f in allowed_md_files]
+        # Current reports and their versions come from the use case's version manifest
+        store = get_version_store(usecase_path)
+        manifest = store.manifest()
+        current_reports = [f for f in allowed_md_files if manifest.get(f, {}).get("current")]
+        versioned_reports = {
+            f: manifest[f]["versions"] for f in allowed_md_files if f in manifest and manifest[f]["versions"]
+        }  # newest first, without the version the current report holds
         
-        # Find versioned reports
-        versioned_reports = {}
-        for base_file in allowed_md_files:
-            base_name = base_file.replace('.md', '')
-            versions = [f for f in all_files if f.startswith(f"{base_name}_v") and f.endswith('.md')]
-            if versions:
-                # Sort versions by timestamp (newest first)
-                versions.sort(reverse=True)
-                versioned_reports[base_file] = versions
+        if st.session_state.get('version_restore_message'):
+            st.success(st.session_state.version_restore_message)
+            st.session_state.version_restore_message = None  # Clear after showing
         
         if not current_reports and not versioned_reports:
             st.info("No designated markdown files found in the root of this use case.")
@@ -597,12 +587,14 @@ elif selected_tab == "Results":
                     # Prominent section header
                     st.markdown("## 📋 Version Selection")
                     
-                    version_options = ["Current Version"] + [f"Version {v.split('_v')[1].replace('.md', '')}" for v in versioned_reports[selected_md_file]]
+                    revisions = {v["version"]: v for v in versioned_reports[selected_md_file]}
+                    version_options = ["Current Version"] + list(revisions)
                     
                     selected_version = st.selectbox(
                         "Select version to view",
                         version_options,
                         index=version_options.index(st.session_state[version_key]) if st.session_state[version_key] in version_options else 0,
+                        format_func=lambda v: v if v == "Current Version" else describe_version(revisions[v]),
                         key=f"version_selector_{selected_md_file}"
                     )
                     # Update session state
@@ -610,64 +602,46 @@ elif selected_tab == "Results":
                     
                     # Show version info
                     if selected_version == "Current Version":
-                        st.info(f"📄 Viewing current version: **{selected_md_file}**")
+                        st.info(f"📄 Viewing current version: **{selected_md_file}** — {describe_current(manifest[selected_md_file]['current'])}")
                     else:
                         st.info(f"📄 Viewing archived version: **{selected_version}**")
                     
+                    selected_revision = None
                     if selected_version != "Current Version":
-                        # Extract timestamp and find corresponding file
-                        version_timestamp = selected_version.replace("Version ", "")
-                        version_file = f"{selected_md_file.replace('.md', '')}_v{version_timestamp}.md"
-                        selected_md_file = version_file
+                        selected_revision = revisions[selected_version]
                         
                         col_info, col_rollback = st.columns([2, 1])
                         with col_info:
-                            timestamp = version_file.split("_v")[1].replace(".md", "")
-                            formatted_time = f"{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]} {timestamp[9:11]}:{timestamp[11:13]}:{timestamp[13:15]}"
-                            st.info(f"� Generated on: {formatted_time}")
+                            st.info(f"🕒 Generated on: {format_version(selected_version)}")
                         with col_rollback:
-                            if st.button("🔄 Restore as Current", key=f"rollback_{version_file}", type="primary"):
+                            if st.button("🔄 Restore as Current", key=f"rollback_{selected_md_file}_{selected_version}", type="primary"):
                                 try:
-                                    # Get paths
-                                    base_file = selected_md_file.split('_v')[0] + '.md'
-                                    current_file_path = os.path.join(usecase_path, base_file)
-                                    version_file_path = os.path.join(usecase_path, version_file)
-                                    
-                                    # Create backup of current version before rollback
-                                    import datetime
-                                    import shutil
-                                    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                                    backup_name = f"{base_file.replace('.md', '')}_v{timestamp}.md"
-                                    backup_path = os.path.join(usecase_path, backup_name)
+                                    # Saves the current report as a version (free if it already is one), then moves the head
+                                    saved = store.restore(selected_md_file, selected_version)
                                     
-                                    # Move current to backup
-                                    if os.path.exists(current_file_path):
-                                        shutil.move(current_file_path, backup_path)
+                                    backup_note = f"Current version saved as version `{saved}`" if saved else "There was no current version to save"
+                                    st.session_state.version_restore_message = (
+                                        f"✅ **Rollback successful!** \n- {backup_note} \n- Version `{selected_version}` is now the current version"
+                                    )
                                     
-                                    # Copy selected version to current
-                                    shutil.copy2(version_file_path, current_file_path)
-                                    
-                                    st.success(f"✅ **Rollback successful!** \n- Current version backed up as `{backup_name}` \n- `{version_file}` is now the current version")
-                                    st.info("💡 **Tip**: The current version has been updated. You can now generate new artifacts based on this version.")
-                                    
-                                    # Reset version selection to current
+                                    # Reset version selection to current and show the restored report
                                     st.session_state[version_key] = "Current Version"
-                                    
-                                    # Wait a moment then rerun to refresh the view
-                                    import time
-                                    time.sleep(1)
                                     st.rerun()
                                     
                                 except Exception as e:
                                     st.error(f"❌ Failed to restore version: {e}")
                 else:
-                    st.info(f"📄 Viewing current version: **{selected_md_file}**")
+                    selected_revision = None
+                    st.info(f"📄 Viewing current version: **{selected_md_file}** — {describe_current(manifest[selected_md_file]['current'])}")
                 
                 # Display the selected report
                 md_path = os.path.join(usecase_path, selected_md_file)
                 try:
-                    with open(md_path, 'r', encoding='utf-8') as f:
-                        md_content = f.read()
+                    if selected_revision is not None:
+                        md_content = store.read(selected_md_file, selected_revision["version"])
+                    else:
+                        with open(md_path, 'r', encoding='utf-8') as f:
+                            md_content = f.read()
                     
                     # Split markdown by mermaid blocks and render accordingly
                     parts = re.split(r"(```mermaid\n.*?\n```)", md_content, flags=re.DOTALL)
@@ -0,0 +1,43 @@
+import time
+import logging
+
+import settings
+import history
+
+
+# Call types of the onboarding flow
+EXTRACTION = "extraction"
+INTENT = "intent"
+ANALYSIS = "analysis"
+
+
+def model_for(route: str) -> str:
+    """Model configured for ``route``; unknown routes get the large model."""
+    return settings.MODEL_ROUTES.get(route, settings.LARGE_MODEL)
+
+
+class RoutedCall:
+    """One LLM call on a route, timed from creation to ``finish``."""
+
+    def __init__(self, route: str, model: str = None):
+        self.route = route
+        self.model = model or model_for(route)
+        self.started_at = time.time()
+        self.first_token_at = None
+
+    def first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.time()
+
+    def finish(self, ok: bool) -> None:
+        finished_at = time.time()
+        ttft = self.first_token_at - self.started_at if self.first_token_at else None
+        try:
+            history.record_llm_call(self.route, self.model, self.started_at, finished_at, ttft, ok)
+        except Exception as e:
+            logging.error(f"Failed to record {self.route} call latency: {e}")
+
+
+def start_call(route: str, model: str = None) -> RoutedCall:
+    """Pick the model for ``route`` (unless ``model`` is given) and start timing the call."""
+    return RoutedCall(route, model)
@@ -4,6 +4,7 @@ import re
 import time
 from ui import apply_compact_styles
 from product_use_case import show_product_use_case_page, initialize_session_state
+from catalog import get_catalog
 
 st.set_page_config(
     page_title="Dashboard",
@@ -106,44 +107,67 @@ with st.expander("Create a New Project", expanded=st.session_state.create_projec
 # --- List Existing Projects ---
 st.subheader("All Projects")
 
-workspace_root = "../workspace"
-projects = []
-if os.path.exists(workspace_root) and os.path.isdir(workspace_root):
-    for entry in os.listdir(workspace_root):
-        p_dir = os.path.join(workspace_root, entry)
-        if os.path.isdir(p_dir):
-            uc_md = os.path.join(p_dir, "usecase.md")
-            if os.path.exists(uc_md):
-                try:
-                    with open(uc_md, "r", encoding="utf-8") as f:
-                        content = f.read()
-                    lines = content.split("\n")
-                    title = lines[0].replace("# ", "").strip() if lines else entry
-                    description = "\n".join(lines[2:]).strip() if len(lines) > 2 else ""
-                except Exception:
-                    title, description = entry, ""
-                projects.append({
-                    "slug": entry,
-                    "title": title or entry,
-                    "description": description
-                })
-
-if not projects:
-    st.info("No projects found yet. Create one using the form above.")
+catalog = get_catalog()
+catalog.refresh()
+
+SORT_LABELS = {"title": "Title", "recent": "Recently updated", "slug": "Identifier"}
+col_filter, col_sort, col_size = st.columns([3, 1, 1])
+with col_filter:
+    search = st.text_input("Filter projects", key="project_filter", placeholder="Search by name, identifier or description",
+                           label_visibility="collapsed")
+with col_sort:
+    sort = st.selectbox("Sort by", list(SORT_LABELS), format_func=SORT_LABELS.get, key="project_sort",
+                        label_visibility="collapsed")
+with col_size:
+    page_size = st.selectbox("Per page", [12, 24, 48, 96], key="project_page_size",
+                             format_func=lambda n: f"{n} per page", label_visibility="collapsed")
+
+# Back to the first page whenever the query changes
+query = (search, sort, page_size)
+if st.session_state.get("project_query") != query:
+    st.session_state.project_query = query
+    st.session_state.project_page = 0
+
+page = st.session_state.project_page
+projects, total = catalog.projects(search, sort, limit=page_size, offset=page * page_size)
+page_count = max(1, -(-total // page_size))
+if page >= page_count:
+    # Projects were removed since the page was chosen
+    page = st.session_state.project_page = page_count - 1
+    projects, total = catalog.projects(search, sort, limit=page_size, offset=page * page_size)
+
+if not total:
+    if search.strip():
+        st.info(f"No projects match \"{search.strip()}\".")
+    else:
+        st.info("No projects found yet. Create one using the form above.")
 else:
-    # Sort alphabetically by title
-    projects.sort(key=lambda p: p["title"].lower())
     cols = st.columns(3)
     for idx, proj in enumerate(projects):
         with cols[idx % 3]:
             with st.container(border=True):
                 st.markdown(f"### {proj['title']}")
-                st.caption(f"`{proj['slug']}`")
-                if proj["description"]:
-                    st.write(proj["description"][:280] + ("..." if len(proj["description"]) > 280 else ""))
+                badges = [f"{len(proj['artifacts'])} artifact{'s' if len(proj['artifacts']) != 1 else ''}"]
+                if proj["has_docs"]:
+                    badges.append("📚 docs")
+                st.caption(f"`{proj['slug']}` · " + " · ".join(badges))
+                if proj["preview"]:
+                    st.write(proj["preview"])
                 open_key = f"open_{proj['slug']}"
                 if st.button("Open", key=open_key, use_container_width=True):
                     st.session_state.selected_usecase = proj["slug"]
                     st.switch_page("pages/10_Project_Dashboard.py")
 
-
+    if page_count > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("← Previous", disabled=page == 0, use_container_width=True):
+                st.session_state.project_page = page - 1
+                st.rerun()
+        with col_info:
+            first = page * page_size + 1
+            st.caption(f"Page {page + 1} of {page_count} · projects {first}–{first + len(projects) - 1} of {total}")
+        with col_next:
+            if st.button("Next →", disabled=page >= page_count - 1, use_container_width=True):
+                st.session_state.project_page = page + 1
+                st.rerun()
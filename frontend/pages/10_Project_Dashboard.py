@@ -2,11 +2,14 @@ import streamlit as st
 import os
 import re
 import subprocess
-import threading
-import queue
-import time
 from streamlit_mermaid import st_mermaid
 from ui import apply_compact_styles
+import settings
+from jobs import get_job_manager, QUEUED, SUCCEEDED, CANCELLED
+from commands import load_commands, COMMANDS_FILE
+from generation import submit_generation
+from version_store import get_version_store, describe_version, describe_current
+from pipeline import start_pipeline, get_pipeline, PENDING, RUNNING, DONE, FAILED, SKIPPED
 
 
 st.set_page_config(
@@ -61,75 +64,61 @@ def _read_usecase_title_and_desc(usecase_path: str):
 
 
 # --- Background command execution utilities ---
-def _reader_thread(proc: subprocess.Popen, q: "queue.Queue[str]") -> None:
-    try:
-        for line in iter(proc.stdout.readline, ''):
-            if not line:
-                break
-            q.put(line)
-        if proc.stdout:
-            proc.stdout.close()
-        rc = proc.wait()
-        q.put(f"---RC:{rc}---")
-    except Exception:
-        q.put("---RC:1---")
+def _render_run(job, title: str) -> None:
+    """Render a job's status box from the viewer's last log offset; only new bytes are read."""
+    view_key = f"run_view_{job.id}"
+    view = st.session_state.get(view_key)
+    if view is None:
+        # Start from the job's in-memory tail, then read only bytes spooled after it
+        log, offset = job.tail()
+        view = st.session_state[view_key] = {"log": log[-settings.LOG_VIEW_CHARS:], "offset": offset}
+    new_text, view["offset"] = job.read_log(view["offset"])
+    if new_text:
+        view["log"] = (view["log"] + new_text)[-settings.LOG_VIEW_CHARS:]
+
+    if job.is_active:
+        queued = job.state == QUEUED
+        with st.status(f"{'Queued' if queued else 'Running'}: {title}", expanded=True):
+            if st.button("⏹ Cancel", key=f"cancel_{job.id}"):
+                get_job_manager().cancel(job.id)
+            if queued:
+                position = get_job_manager().queue_position(job.id)
+                st.caption(f"⏳ Waiting for a backend slot — position {position or '?'} in queue")
+            if view["log"]:
+                st.code(view["log"])
+        return
+
+    if job.state == SUCCEEDED:
+        label, state, expanded = f"Completed: {title}", "complete", False
+    elif job.state == CANCELLED:
+        label, state, expanded = f"Cancelled: {title}", "error", True
+    else:
+        label, state, expanded = f"Failed: {title}", "error", True
+    with st.status(label, state=state, expanded=expanded):
+        if view["log"]:
+            st.code(view["log"])
 
 
-def start_background(run_key: str, shell_cmd: str) -> None:
-    if 'cmd_runs' not in st.session_state:
-        st.session_state.cmd_runs = {}
-    # Prevent duplicate run keys
-    if run_key in st.session_state.cmd_runs and st.session_state.cmd_runs[run_key].get('process') and st.session_state.cmd_runs[run_key]['process'].poll() is None:
+@st.fragment(run_every=settings.PROGRESS_REFRESH_SECONDS)
+def _live_run_progress(job_id: str, title: str):
+    # Timer-driven: each tick renders the delta and returns, releasing the script thread
+    job = get_job_manager().get(job_id)
+    if not job:
         return
-    q: "queue.Queue[str]" = queue.Queue()
-    proc = subprocess.Popen(
-        shell_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-        text=True, cwd="../", bufsize=1, universal_newlines=True
-    )
-    th = threading.Thread(target=_reader_thread, args=(proc, q), daemon=True)
-    th.start()
-    st.session_state.cmd_runs[run_key] = {
-        'process': proc,
-        'q': q,
-        'log': '',
-        'return_code': None,
-        'started_at': time.time(),
-    }
+    _render_run(job, title)
+    if not job.is_active:
+        # Re-render the page once so the finished job drops off the timer
+        st.rerun()
 
 
-@st.fragment
-def show_run_progress(run_key: str, title: str):
-    info = st.session_state.cmd_runs.get(run_key)
-    if not info:
+def show_run_progress(job_id: str, title: str):
+    job = get_job_manager().get(job_id)
+    if not job:
         return
-    label = f"Running: {title}"
-    with st.status(label, expanded=True) as status:
-        log_placeholder = st.empty()
-        while True:
-            q = info.get('q')
-            if q:
-                while not q.empty():
-                    line = q.get_nowait()
-                    if line.startswith("---RC:"):
-                        try:
-                            info['return_code'] = int(line.replace("---RC:", "").replace("---", ""))
-                        except Exception:
-                            info['return_code'] = 1
-                    else:
-                        info['log'] += line
-            # Update the visible log
-            if info.get('log'):
-                log_placeholder.code(info['log'][-6000:])
-
-            # Exit when finished
-            if info.get('return_code') is not None:
-                if info['return_code'] == 0:
-                    status.update(label=f"Completed: {title}", state="complete", expanded=False)
-                else:
-                    status.update(label=f"Failed: {title}", state="error")
-                break
-            else:
-                time.sleep(0.5)
+    if job.is_active:
+        _live_run_progress(job_id, title)
+    else:
+        _render_run(job, title)
 
 
 selected_usecase = st.session_state.get("selected_usecase")
@@ -157,31 +146,82 @@ st.subheader("⚙️ Actions")
 
 # Parse commands from frontend/commands.md
 command_map = {}
-commands_file = os.path.join(".", "commands.md")
 try:
-    if os.path.exists(commands_file):
-        with open(commands_file, "r", encoding="utf-8") as f:
-            relative_usecase_path = os.path.join("workspace", selected_usecase) + os.sep
-            for line in f:
-                if line.strip():
-                    parts = [p.strip() for p in line.strip().split(",", 2)]
-                    if len(parts) >= 2:
-                        name = parts[0]
-                        command_template = parts[1]
-                        output_file = parts[2] if len(parts) > 2 else None
-                        command = command_template.replace("$USECASE", relative_usecase_path)
-                        command_map[name] = (command, output_file)
+    if os.path.exists(COMMANDS_FILE):
+        command_map = load_commands(selected_usecase)
 except Exception as e:
     st.error(f"Failed to load commands: {e}")
 
+
+def _render_pipeline_status(pipeline):
+    rows = pipeline.status()
+    icons = {PENDING: "⏳", RUNNING: "🔄", DONE: "✅", FAILED: "❌", SKIPPED: "⏭"}
+    for row in rows:
+        needs = f" — needs {', '.join(row['needs'])}" if row["needs"] else ""
+        reason = f" ({row['reason']})" if row["reason"] else ""
+        st.markdown(f"{icons.get(row['state'], '')} **{row['name']}**: {row['state']}{reason}{needs}")
+
+
+@st.fragment(run_every=settings.PROGRESS_REFRESH_SECONDS)
+def _live_pipeline_status(usecase):
+    pipeline = get_pipeline(usecase)
+    if not pipeline:
+        return
+    _render_pipeline_status(pipeline)
+    if not pipeline.is_active:
+        st.rerun()
+
+
+def show_pipeline_status(pipeline):
+    if pipeline.is_active:
+        _live_pipeline_status(pipeline.usecase)
+    else:
+        _render_pipeline_status(pipeline)
+
+
+force_regenerate = st.checkbox(
+    "Force regeneration (bypass cache)", value=False,
+    help="Identical inputs are normally restored from the generation cache instead of re-running the backend."
+)
+
+if command_map:
+    with st.expander("⏩ Generate all", expanded=False):
+        pipeline = get_pipeline(selected_usecase)
+        if pipeline and pipeline.is_active:
+            st.info("A Generate all run is in progress for this project.")
+        else:
+            missing = [
+                name for name, c in command_map.items()
+                if not (c.output_file and os.path.exists(os.path.join(usecase_path, c.output_file)))
+            ]
+            selected_names = st.multiselect(
+                "Artifacts to generate", list(command_map.keys()), default=missing,
+                help="Independent artifacts run concurrently; dependent ones start once their inputs exist. "
+                     "Existing reports are saved as versions before they are regenerated."
+            )
+            parallelism = st.number_input("Parallelism", min_value=1, max_value=16, value=settings.PIPELINE_PARALLELISM)
+            if st.button("⏩ Generate all", type="primary", disabled=not selected_names):
+                try:
+                    pipeline = start_pipeline(
+                        selected_usecase, [command_map[n] for n in selected_names],
+                        max_parallel=parallelism, force=force_regenerate
+                    )
+                except ValueError as e:
+                    st.error(str(e))
+        if pipeline:
+            show_pipeline_status(pipeline)
+
 if not command_map:
     st.info("No commands found in commands.md")
 else:
+    if 'cmd_runs' not in st.session_state:
+        st.session_state.cmd_runs = {}  # "<usecase>:<command>" -> job id
+    job_manager = get_job_manager()
     st.markdown('<div class="actions-grid">', unsafe_allow_html=True)
     names = list(command_map.keys())
     cols = st.columns(2)
     for idx, name in enumerate(names):
-        cmd, output_file = command_map[name]
+        cmd, output_file = command_map[name].command, command_map[name].output_file
         with cols[idx % len(cols)]:
             with st.container(border=True):
                     # Header row: title + compact action icons
@@ -201,33 +241,39 @@ else:
 
                     # Filename caption removed for a more compact card
 
+                    # Jobs live in the process-wide job table, so a run started from
+                    # another tab or an earlier session is re-attached here.
+                    active_job = job_manager.find_active(selected_usecase, name)
+                    run_key = f"{selected_usecase}:{name}"
+
                     # Generate (icon-only) button - Non-blocking
                     if gen_clicked:
                         should_run = True
-                        if output_file and os.path.exists(report_file_path):
+                        if active_job:
+                            st.info(f"'{name}' is already running.")
+                            should_run = False
+                        elif output_file and os.path.exists(report_file_path):
                             st.warning(f"Report '{output_file}' exists. Use New Version.")
                             should_run = False
                         if should_run:
-                            run_key = f"run_{idx}_{name}"
-                            start_background(run_key, cmd)
-                            show_run_progress(run_key, name)
+                            active_job = submit_generation(command_map[name], selected_usecase, force=force_regenerate)
+                            st.session_state.cmd_runs[run_key] = active_job.id
 
                     # New Version (icon-only) button (only if output exists now) - Non-blocking
-                    if new_clicked:
-                        import datetime
-                        import shutil
+                    if new_clicked and active_job:
+                        st.info(f"'{name}' is already running.")
+                    elif new_clicked:
                         try:
-                            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                            base_name = output_file.replace('.md', '')
-                            versioned_name = f"{base_name}_v{timestamp}.md"
-                            versioned_path = os.path.join(usecase_path, versioned_name)
-                            shutil.move(report_file_path, versioned_path)
-                            st.success(f"Backed up as '{versioned_name}'. Generating…")
-                            run_key = f"newver_{idx}_{name}"
-                            start_background(run_key, cmd)
-                            show_run_progress(run_key, name)
+                            version = get_version_store(usecase_path).archive(output_file)
+                            st.success(f"Saved as version {version}. Generating…")
+                            active_job = submit_generation(command_map[name], selected_usecase, force=force_regenerate)
+                            st.session_state.cmd_runs[run_key] = active_job.id
                         except Exception as e:
                             st.error(f"Failed to create new version: {e}")
+
+                    job_id = active_job.id if active_job else st.session_state.cmd_runs.get(run_key)
+                    if job_id:
+                        show_run_progress(job_id, name)
         st.markdown('</div>', unsafe_allow_html=True)
 
 st.markdown("---")
@@ -240,16 +286,12 @@ else:
     file_to_report_map = dict(zip(allowed_md_files, report_names))
     report_to_file_map = dict(zip(report_names, allowed_md_files))
 
-    all_files = os.listdir(usecase_path)
-    current_reports = [f for f in all_files if f in allowed_md_files]
-
-    versioned_reports = {}
-    for base_file in allowed_md_files:
-        base_name = base_file.replace('.md', '')
-        versions = [f for f in all_files if f.startswith(f"{base_name}_v") and f.endswith('.md')]
-        if versions:
-            versions.sort(reverse=True)
-            versioned_reports[base_file] = versions
+    store = get_version_store(usecase_path)
+    manifest = store.manifest()
+    current_reports = [f for f in allowed_md_files if manifest.get(f, {}).get("current")]
+    versioned_reports = {
+        f: manifest[f]["versions"] for f in allowed_md_files if f in manifest and manifest[f]["versions"]
+    }
 
     if not current_reports and not versioned_reports:
         st.info("No designated markdown reports found for this project.")
@@ -262,22 +304,25 @@ else:
         if selected_report_name:
             selected_md_file = report_to_file_map[selected_report_name]
 
+            selected_version = "Current Version"
             if selected_md_file in versioned_reports:
-                version_options = ["Current Version"] + [
-                    f"Version {v.split('_v')[1].replace('.md', '')}" for v in versioned_reports[selected_md_file]
-                ]
-                selected_version = st.selectbox("Select version", version_options)
+                revisions = {v["version"]: v for v in versioned_reports[selected_md_file]}
+                selected_version = st.selectbox(
+                    "Select version", ["Current Version"] + list(revisions),
+                    format_func=lambda v: v if v == "Current Version" else describe_version(revisions[v]),
+                )
                 if selected_version != "Current Version":
-                    version_timestamp = selected_version.replace("Version ", "")
-                    selected_md_file = f"{selected_md_file.replace('.md', '')}_v{version_timestamp}.md"
                     st.info(f"📄 Viewing archived version: {selected_version}")
                 else:
-                    st.info(f"📄 Viewing current version: {selected_md_file}")
+                    st.info(f"📄 Viewing current version: {selected_md_file} — {describe_current(manifest[selected_md_file]['current'])}")
 
             md_path = os.path.join(usecase_path, selected_md_file)
             try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
+                if selected_version != "Current Version":
+                    md_content = store.read(selected_md_file, selected_version)
+                else:
+                    with open(md_path, 'r', encoding='utf-8') as f:
+                        md_content = f.read()
                 parts = re.split(r"(```mermaid\n.*?\n```)", md_content, flags=re.DOTALL)
                 for part in parts:
                     if part.strip().startswith("```mermaid"):
@@ -0,0 +1,164 @@
+import streamlit as st
+import datetime
+import time
+from ui import apply_compact_styles
+from history import artifact_stats, recent_runs, route_stats, event_counts, docs_build_stats
+from response_cache import get_response_cache
+
+st.set_page_config(
+    page_title="Run History",
+    page_icon="",
+    layout="wide"
+)
+
+apply_compact_styles()
+
+st.title("Run History")
+st.caption("Duration percentiles and failure rates per artifact, recorded for every generation run")
+
+
+def _fmt_seconds(value):
+    return f"{value:.1f}" if value is not None else "—"
+
+
+def _fmt_time(ts):
+    return datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else "—"
+
+
+col_scope, col_window = st.columns(2)
+with col_scope:
+    only_selected = st.checkbox(
+        "Only the selected project",
+        value=False,
+        disabled=not st.session_state.get("selected_usecase"),
+        help="Restrict statistics to the project opened from the Dashboard"
+    )
+with col_window:
+    window = st.selectbox("Time window", ["All time", "Last 24 hours", "Last 7 days", "Last 30 days"])
+
+usecase = st.session_state.get("selected_usecase") if only_selected else None
+since = {
+    "Last 24 hours": time.time() - 86400,
+    "Last 7 days": time.time() - 7 * 86400,
+    "Last 30 days": time.time() - 30 * 86400,
+}.get(window)
+
+try:
+    stats = artifact_stats(usecase=usecase, since=since)
+    runs = recent_runs(limit=100, usecase=usecase, since=since)
+    routes = route_stats(since=since)
+    response_cache = get_response_cache().stats()
+    events = event_counts(since=since)
+    docs_builds = docs_build_stats(usecase=usecase, since=since)
+except Exception as e:
+    st.error(f"Failed to read run history: {e}")
+    st.stop()
+
+st.subheader("📈 Per-artifact latency")
+if not stats:
+    st.info("No runs recorded yet. Generate an artifact to start collecting history.")
+else:
+    st.dataframe(
+        [
+            {
+                "Artifact": s["command"],
+                "Runs": s["runs"],
+                "Cache hits": s["cache_hits"],
+                "Failures": s["failures"],
+                "Failure rate": f"{s['failure_rate']:.0%}",
+                "p50 (s)": _fmt_seconds(s["p50_s"]),
+                "p95 (s)": _fmt_seconds(s["p95_s"]),
+                "p99 (s)": _fmt_seconds(s["p99_s"]),
+                "Avg output (bytes)": s["avg_output_bytes"],
+                "Prompt cache read": s["cache_read_tokens"],
+                "Prompt cache write": s["cache_write_tokens"],
+            }
+            for s in stats
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption(
+        "Durations and failure rates exclude runs served from the generation cache. Cancelled runs count as failures. "
+        "Prompt cache columns are input tokens read from / written to the prompt cache by SDK-backend runs."
+    )
+
+st.subheader("🕒 Recent runs")
+if runs:
+    st.dataframe(
+        [
+            {
+                "Finished": _fmt_time(r["finished_at"]),
+                "Artifact": r["command"],
+                "Project": r["usecase"],
+                "State": r["state"] if r["ran_process"] or r["state"] != "succeeded" else "cached",
+                "Exit code": r["exit_code"],
+                "Duration (s)": _fmt_seconds(r["finished_at"] - r["started_at"]) if r["started_at"] and r["finished_at"] else "—",
+                "Output (bytes)": r["output_bytes"],
+                "Prompt cache read/write": (
+                    f"{r['cache_read_tokens'] or 0} / {r['cache_write_tokens'] or 0}"
+                    if r["input_tokens"] is not None else "—"
+                ),
+            }
+            for r in runs
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+st.subheader("🤖 Onboarding model routes")
+if not routes:
+    st.info("No onboarding calls recorded yet.")
+else:
+    st.dataframe(
+        [
+            {
+                "Route": r["route"],
+                "Model": r["model"],
+                "Calls": r["calls"],
+                "Errors": r["errors"],
+                "p50 (s)": _fmt_seconds(r["p50_s"]),
+                "p95 (s)": _fmt_seconds(r["p95_s"]),
+                "Time to first token p50 (s)": _fmt_seconds(r["ttft_p50_s"]),
+            }
+            for r in routes
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption("Latency of the onboarding chat and analysis calls per route. Routes are shared by all projects.")
+
+col_hits, col_rate, col_entries, col_size = st.columns(4)
+col_hits.metric("Response cache hits / misses", f"{response_cache['hits']} / {response_cache['misses']}")
+col_rate.metric("Hit rate", f"{response_cache['hit_rate']:.0%}")
+col_entries.metric("Cached responses", response_cache["entries"], help=f"{response_cache['evictions']} evicted (LRU)")
+col_size.metric("Cache size", f"{response_cache['bytes'] / 1024:.0f} KB")
+
+valid, repaired, invalid = (events.get(k, 0) for k in ("extraction_valid", "extraction_repaired", "extraction_invalid"))
+extractions = valid + repaired + invalid
+if extractions:
+    col_valid, col_repaired, col_failed, col_fallback = st.columns(4)
+    col_valid.metric("Schema-valid extractions", valid, help="Valid on the first attempt")
+    col_repaired.metric("Repaired", repaired, help="Valid after the single repair attempt")
+    col_failed.metric("Schema failure rate", f"{(repaired + invalid) / extractions:.0%}", help=f"{invalid} still invalid after repair")
+    col_fallback.metric("Fallback turns", events.get("extraction_fallback", 0), help="Turns that stored the raw answer and asked the default next question")
+
+st.subheader("📚 Documentation builds")
+if not docs_builds:
+    st.info("No documentation builds recorded yet.")
+else:
+    st.dataframe(
+        [
+            {
+                "Mode": b["mode"],
+                "Builds": b["builds"],
+                "Failures": b["failures"],
+                "p50 (s)": _fmt_seconds(b["p50_s"]),
+                "p95 (s)": _fmt_seconds(b["p95_s"]),
+            }
+            for b in docs_builds
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption("skipped: sources unchanged · dirty: only edited pages rebuilt · full: rebuilt without --clean · clean: pages were removed or the site was missing")
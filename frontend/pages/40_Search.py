@@ -0,0 +1,79 @@
+import streamlit as st
+import time
+from ui import apply_compact_styles
+from catalog import get_catalog
+from search_index import get_search_index
+
+st.set_page_config(
+    page_title="Search",
+    page_icon="",
+    layout="wide"
+)
+
+apply_compact_styles()
+
+st.title("Search")
+st.caption("Full-text search across every use case and generated artifact, including saved versions")
+
+PAGE_SIZE = 20
+
+index = get_search_index()
+index.refresh()
+
+col_query, col_scope, col_versions = st.columns([3, 1, 1])
+with col_query:
+    query = st.text_input("Search", key="search_query", placeholder='e.g. GDPR, PostgreSQL, "data retention", auth*',
+                          label_visibility="collapsed")
+with col_scope:
+    catalog = get_catalog()
+    catalog.refresh()
+    slugs = [p["slug"] for p in catalog.projects(sort="slug")[0]]
+    scope = st.selectbox("Project", ["All projects"] + slugs, key="search_scope", label_visibility="collapsed")
+with col_versions:
+    include_versions = st.checkbox("Include saved versions", value=True, key="search_versions")
+
+if st.session_state.get("search_last") != (query, scope, include_versions):
+    st.session_state.search_last = (query, scope, include_versions)
+    st.session_state.search_page = 0
+page = st.session_state.get("search_page", 0)
+
+if not query.strip():
+    stats = index.stats()
+    st.info(f"{stats['documents']} documents indexed across {stats['usecases']} projects.")
+else:
+    started = time.perf_counter()
+    hits, total = index.search(
+        query,
+        usecase=None if scope == "All projects" else scope,
+        include_versions=include_versions,
+        limit=PAGE_SIZE,
+        offset=page * PAGE_SIZE,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f"{total} matching documents in {elapsed_ms:.1f} ms")
+
+    for idx, hit in enumerate(hits):
+        with st.container(border=True):
+            col_text, col_open = st.columns([5, 1])
+            with col_text:
+                version = f" · version {hit.version}" if hit.version else ""
+                st.markdown(f"**{hit.usecase}** / `{hit.artifact}`{version}")
+                st.markdown(hit.snippet.replace("\n", " "))
+            with col_open:
+                if st.button("Open", key=f"search_open_{page}_{idx}", use_container_width=True):
+                    st.session_state.selected_usecase = hit.usecase
+                    st.switch_page("pages/10_Project_Dashboard.py")
+
+    page_count = max(1, -(-total // PAGE_SIZE))
+    if page_count > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("← Previous", disabled=page == 0, use_container_width=True):
+                st.session_state.search_page = page - 1
+                st.rerun()
+        with col_info:
+            st.caption(f"Page {page + 1} of {page_count}")
+        with col_next:
+            if st.button("Next →", disabled=page >= page_count - 1, use_container_width=True):
+                st.session_state.search_page = page + 1
+                st.rerun()
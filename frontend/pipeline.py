@@ -0,0 +1,213 @@
+import os
+import logging
+import threading
+import time
+import uuid
+
+import settings
+from jobs import get_job_manager, SUCCEEDED
+from generation import submit_generation
+from version_store import get_version_store
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class PipelineNode:
+    def __init__(self, command):
+        self.command = command
+        self.upstream = set()
+        self.state = PENDING
+        self.job_id = None
+        self.reason = ""
+
+    @property
+    def name(self) -> str:
+        return self.command.name
+
+
+class Pipeline:
+    """Runs a set of commands.md entries as a DAG built from their ``needs``/outputs.
+
+    Independent nodes start concurrently (up to ``max_parallel``); a dependent
+    node starts as soon as every upstream node has succeeded and its inputs exist.
+    """
+
+    def __init__(self, usecase, commands, max_parallel=settings.PIPELINE_PARALLELISM, force=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.usecase = usecase
+        self.usecase_path = os.path.join("../workspace", usecase)
+        self.max_parallel = max(1, int(max_parallel))
+        self.force = force
+        self.nodes = {c.name: PipelineNode(c) for c in commands}
+        self.started_at = None
+        self.finished_at = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        producers = {}
+        for node in self.nodes.values():
+            for path in node.command.outputs:
+                producers[path] = node.name
+        self._producers = producers
+        for node in self.nodes.values():
+            for path in node.command.needs:
+                producer = producers.get(path)
+                if producer and producer != node.name:
+                    node.upstream.add(producer)
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in commands.md involving '{name}'")
+            visiting.add(name)
+            for upstream in self.nodes[name].upstream:
+                visit(upstream)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    @property
+    def is_active(self) -> bool:
+        return any(n.state in (PENDING, RUNNING) for n in self.nodes.values())
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._schedule, name=f"pilot-pipeline-{self.id}", daemon=True)
+        self._thread.start()
+
+    def status(self):
+        """Return a list of per-node status dicts in declaration order."""
+        with self._lock:
+            return [
+                {"name": n.name, "state": n.state, "needs": sorted(n.upstream), "job_id": n.job_id, "reason": n.reason}
+                for n in self.nodes.values()
+            ]
+
+    # --- Scheduling ---
+    def _input_exists(self, path: str) -> bool:
+        return os.path.exists(os.path.join(self.usecase_path, path))
+
+    def _archive_outputs(self, node) -> None:
+        """Save existing reports of ``node`` as versions before they are regenerated, as "New Version" does."""
+        store = get_version_store(self.usecase_path)
+        for path in node.command.outputs:
+            if path.endswith(".md") and "/" not in path and self._input_exists(path):
+                version = store.archive(path)
+                logging.info(f"Pipeline {self.id} saved {path} as version {version} before regenerating it")
+
+    def _on_job_complete(self, job) -> None:
+        self._wake.set()
+
+    def _schedule(self) -> None:
+        logging.info(f"Pipeline {self.id} started for {self.usecase}: {', '.join(self.nodes)}")
+        try:
+            self._schedule_loop()
+        except Exception as e:
+            # A dead scheduler must not leave the pipeline active, or no new run could start for this use case
+            logging.exception(f"Pipeline {self.id} scheduler failed for {self.usecase}")
+            with self._lock:
+                for node in self.nodes.values():
+                    if node.state == RUNNING:
+                        node.state = FAILED
+                        node.reason = f"scheduler error: {e}"
+                    elif node.state == PENDING:
+                        node.state = SKIPPED
+                        node.reason = f"scheduler error: {e}"
+        self.finished_at = time.time()
+        logging.info(f"Pipeline {self.id} finished for {self.usecase}: " + ", ".join(f"{n.name}={n.state}" for n in self.nodes.values()))
+
+    def _schedule_loop(self) -> None:
+        manager = get_job_manager()
+        while True:
+            with self._lock:
+                # Collect finished jobs
+                for node in self.nodes.values():
+                    if node.state == RUNNING:
+                        job = manager.get(node.job_id)
+                        if job is None or not job.is_active:
+                            node.state = DONE if job is not None and job.state == SUCCEEDED else FAILED
+                            if node.state == FAILED:
+                                node.reason = f"exit code {job.return_code}" if job is not None else "job lost"
+
+                running = sum(1 for n in self.nodes.values() if n.state == RUNNING)
+                started = False
+                for node in self.nodes.values():
+                    if node.state != PENDING:
+                        continue
+                    upstream_states = [self.nodes[u].state for u in node.upstream]
+                    if any(s in (FAILED, SKIPPED) for s in upstream_states):
+                        node.state = SKIPPED
+                        node.reason = "upstream failed"
+                        continue
+                    if any(s != DONE for s in upstream_states):
+                        continue
+                    if not all(self._input_exists(p) for p in node.command.needs):
+                        continue
+                    if running >= self.max_parallel:
+                        continue
+                    try:
+                        job = manager.find_active(self.usecase, node.name)
+                        if job is None:
+                            self._archive_outputs(node)
+                            job = submit_generation(
+                                node.command, self.usecase, force=self.force, on_complete=[self._on_job_complete]
+                            )
+                    except Exception as e:
+                        logging.exception(f"Pipeline {self.id} could not start {node.name}")
+                        node.state = FAILED
+                        node.reason = f"could not start: {e}"
+                        # Its dependents are skipped as "upstream failed" on the next pass
+                        started = True
+                        continue
+                    node.job_id = job.id
+                    node.state = RUNNING
+                    running += 1
+                    started = True
+
+                # Nodes whose inputs can no longer appear are skipped once nothing is running
+                if running == 0 and not started:
+                    for node in self.nodes.values():
+                        if node.state == PENDING:
+                            node.state = SKIPPED
+                            missing = [p for p in node.command.needs if not self._input_exists(p)]
+                            node.reason = f"missing input: {', '.join(missing)}" if missing else "not runnable"
+
+                if not self.is_active:
+                    break
+            self._wake.wait(timeout=2)
+            self._wake.clear()
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def start_pipeline(usecase, commands, max_parallel=settings.PIPELINE_PARALLELISM, force=False) -> Pipeline:
+    """Start a "Generate all" run for ``usecase`` unless one is already active."""
+    with _pipelines_lock:
+        current = _pipelines.get(usecase)
+        if current and current.is_active:
+            return current
+        pipeline = Pipeline(usecase, commands, max_parallel=max_parallel, force=force)
+        _pipelines[usecase] = pipeline
+    pipeline.start()
+    return pipeline
+
+
+def get_pipeline(usecase):
+    """Return the most recent pipeline for ``usecase`` (shared across sessions)."""
+    with _pipelines_lock:
+        return _pipelines.get(usecase)
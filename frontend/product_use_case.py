@@ -3,12 +3,147 @@ import streamlit as st
 from anthropic import Anthropic
 import json
 import re
+import logging
+import settings
+from model_router import start_call, EXTRACTION, INTENT, ANALYSIS
+from history import record_event
+from response_cache import get_response_cache, request_key
+import fast_extract
+from chat_turns import get_chat_runner
+from catalog import get_catalog
+from version_store import get_version_store
 
-def get_claude_response(prompt, context="", is_data_collection=False):
-    """Get response from Claude"""
+def _partial_json_string(text, field):
+    """Best-effort value of string ``field`` in a JSON document that is still being streamed."""
+    match = re.search(r'"' + re.escape(field) + r'"\s*:\s*"((?:[^"\\]|\\.)*)', text)
+    if not match:
+        return ""
+    value = match.group(1)
+    # Drop a dangling escape so the fragment always decodes
+    if value.endswith("\\") and not value.endswith("\\\\"):
+        value = value[:-1]
+    try:
+        return json.loads(f'"{value}"')
+    except json.JSONDecodeError:
+        return value
+
+def _display_text(text, is_data_collection):
+    """Part of a (possibly partial) reply to show in the chat bubble.
+
+    Data collection replies are JSON, so only the ``next_question`` being
+    written is shown; the caller still parses the complete text.
+    """
+    return _partial_json_string(text, "next_question") if is_data_collection else text
+
+def _api_key():
+    try:
+        return st.secrets["ANTHROPIC_API_KEY"]
+    except Exception:
+        return os.environ.get("ANTHROPIC_API_KEY")
+
+EXTRACTION_FIELDS = ["name", "description", "countries", "platforms", "constraints", "criticality"]
+
+# Output schema of the data collection call; the model is forced to answer through this tool
+EXTRACTION_TOOL = {
+    "name": "record_project_fields",
+    "description": "Record the project fields found in the user's message and ask for the next missing one.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "extracted_data": {
+                "type": "object",
+                "description": "Only the fields that could confidently be extracted from the user's input",
+                "properties": {field: {"type": "string"} for field in EXTRACTION_FIELDS},
+                "additionalProperties": False,
+            },
+            "next_question": {
+                "type": "string",
+                "description": "Conversational response asking about the next piece of information needed",
+            },
+            "missing_fields": {
+                "type": "array",
+                "items": {"type": "string", "enum": EXTRACTION_FIELDS},
+                "description": "Names of the fields that still need to be collected",
+            },
+        },
+        "required": ["extracted_data", "next_question", "missing_fields"],
+    },
+}
+
+def validate_extraction(data):
+    """Check a data collection result against ``EXTRACTION_TOOL``'s schema; returns a list of problems"""
+    if not isinstance(data, dict):
+        return ["the result must be an object"]
+    errors = []
+    extracted = data.get("extracted_data")
+    if not isinstance(extracted, dict):
+        errors.append("extracted_data must be an object")
+    else:
+        for field, value in extracted.items():
+            if field not in EXTRACTION_FIELDS:
+                errors.append(f"extracted_data has unknown field '{field}'")
+            elif not isinstance(value, str):
+                errors.append(f"extracted_data.{field} must be a string")
+    if not isinstance(data.get("next_question"), str) or not data.get("next_question", "").strip():
+        errors.append("next_question must be a non-empty string")
+    missing = data.get("missing_fields")
+    if not isinstance(missing, list) or any(field not in EXTRACTION_FIELDS for field in missing):
+        errors.append(f"missing_fields must be a list of: {', '.join(EXTRACTION_FIELDS)}")
+    return errors
+
+def _tool_input(message):
+    """Input of the extraction tool call in ``message``, or None if the model did not call it"""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use" and block.name == EXTRACTION_TOOL["name"]:
+            return block.input
+    return None
+
+def _validated_extraction(client, request, message):
+    """Return the extraction result of ``message`` as JSON, with one repair round trip if it breaks the schema"""
+    data = _tool_input(message)
+    errors = validate_extraction(data) if data is not None else ["no record_project_fields call"]
+    if not errors:
+        record_event("extraction_valid")
+        return json.dumps(data)
+
+    # One bounded repair attempt: hand the problems back and ask for a corrected call
+    assistant_content, tool_use_id = [], None
+    for block in message.content:
+        if block.type == "tool_use":
+            assistant_content.append({"type": "tool_use", "id": block.id, "name": block.name, "input": block.input})
+            tool_use_id = tool_use_id or block.id
+        elif block.type == "text":
+            assistant_content.append({"type": "text", "text": block.text})
+    feedback = "Invalid result: " + "; ".join(errors) + ". Call record_project_fields again with a corrected result."
+    if tool_use_id:
+        reply = [{"type": "tool_result", "tool_use_id": tool_use_id, "is_error": True, "content": feedback}]
+    else:
+        reply = feedback
+    repair_request = dict(request, messages=request["messages"] + [
+        {"role": "assistant", "content": assistant_content or [{"type": "text", "text": "(no answer)"}]},
+        {"role": "user", "content": reply},
+    ])
+    repaired = client.messages.create(**repair_request)
+    data = _tool_input(repaired)
+    if data is not None and not validate_extraction(data):
+        record_event("extraction_repaired")
+        return json.dumps(data)
+    record_event("extraction_invalid")
+    return ""
+
+def call_claude(prompt, is_data_collection=False, route=None, use_cache=True, api_key=None, on_text=None):
+    """Call Claude without touching Streamlit, so it can run off the script thread.
+
+    ``on_text`` receives the accumulated reply text while it streams in.
+    ``route`` selects the model (see ``model_router``); by default data
+    collection uses the extraction route and everything else the intent route.
+    Identical requests are answered from the response cache unless
+    ``use_cache`` is False. Data collection replies are the validated
+    extraction JSON, or "" if it stayed invalid. API errors are raised.
+    """
+    call = start_call(route or (EXTRACTION if is_data_collection else INTENT))
+    ok = False
     try:
-        client = Anthropic(api_key=st.secrets['ANTHROPIC_API_KEY'])
-        
         if is_data_collection:
             system_prompt = """You are a product planning assistant collecting project information. Ask crisp, direct questions.
 
@@ -21,19 +156,7 @@ Current collection requirements:
 - Criticality: Business criticality level (1=Low, 2=Medium-Low, 3=Medium, 4=High, 5=Critical)
 
 IMPORTANT: Extract ALL information from user input when provided. Users may provide information for multiple fields in a single message.
-Always return your response in this JSON format (and only this format):
-{
-  "extracted_data": {
-    "name": "extracted project name if present",
-    "description": "extracted description if present",
-    "countries": "extracted countries if present",
-    "platforms": "extracted platforms if present",
-    "constraints": "extracted constraints if present",
-    "criticality": "extracted criticality if present"
-  },
-  "next_question": "Your conversational response asking about the next piece of information needed",
-  "missing_fields": ["list", "of", "field", "names", "still", "missing"]
-}
+Always answer by calling the record_project_fields tool.
 
 Only include fields in extracted_data that you could confidently extract from the user's input.
 The missing_fields array should contain the names of fields that still need to be collected.
@@ -47,79 +170,120 @@ When users express interest in:
 
 Always be friendly and guide them through their decision. Try to suggest criticality based on above input. If they're unclear, ask clarifying questions to help them decide."""
 
+        request = dict(
+            model=call.model,
+            max_tokens=settings.ONBOARDING_MAX_TOKENS,
+            temperature=0.7,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        if is_data_collection:
+            request.update(tools=[EXTRACTION_TOOL], tool_choice={"type": "tool", "name": EXTRACTION_TOOL["name"]})
+
+        cache = get_response_cache() if use_cache and settings.RESPONSE_CACHE_ENABLED else None
+        key = request_key(request["model"], request["system"], request["messages"], request["temperature"])
+        response_text = cache.get(key) if cache else None
+
+        if response_text is not None:
+            call.model = "cache"
+            if on_text:
+                on_text(response_text)
+        else:
+            client = Anthropic(api_key=api_key)
+            if on_text:
+                response_text = ""
+                with client.messages.stream(**request) as message_stream:
+                    for event in message_stream:
+                        if event.type != "content_block_delta":
+                            continue
+                        # Text replies stream text deltas; tool calls stream their JSON input
+                        delta = getattr(event.delta, "text", None) or getattr(event.delta, "partial_json", None)
+                        if delta:
+                            call.first_token()
+                            response_text += delta
+                            on_text(response_text)
+                    message = message_stream.get_final_message()
+            else:
+                message = client.messages.create(**request)
+                response_text = message.content[0].text if hasattr(message.content[0], 'text') else str(message.content[0])
+            if is_data_collection:
+                response_text = _validated_extraction(client, request, message)
+            if cache and response_text:
+                cache.put(key, response_text)
+        ok = True
+        return response_text
+    finally:
+        call.finish(ok)
+
+def apply_intent(response_text):
+    """Act on the NEW/EXISTING decision in an intent reply and return the message to show"""
+    if "NEW_USE_CASE" in response_text:
+        st.session_state.use_case_step = "create_new"
+        # Clear chat and start fresh for new project
+        st.session_state.onboarding_chat = []
+        st.session_state.use_case_data = {}
+        st.session_state.collection_step = "name"
+        return "Perfect! Let's create your new project. What's the name of your project?"
+    elif "EXISTING_USE_CASE" in response_text:
+        st.session_state.use_case_step = "select_existing"
+        return "Great! You want to work with an existing project. Let me show you what's available."
+    return response_text
+
+def get_claude_response(prompt, context="", is_data_collection=False, route=None, use_cache=True):
+    """Get response from Claude
+
+    See ``call_claude`` for ``route`` and ``use_cache``.
+    """
+    try:
         with st.spinner("Thinking..."):
-            message = client.messages.create(
-                model="claude-opus-4-1-20250805",  # Fixed model name
-                max_tokens=1024,
-                temperature=0.7,
-                system=system_prompt,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            response_text = message.content[0].text if hasattr(message.content[0], 'text') else str(message.content[0])
-            
-            if not is_data_collection:
-                # Check for decision keywords
-                if "NEW_USE_CASE" in response_text:
-                    st.session_state.use_case_step = "create_new"
-                    # Clear chat and start fresh for new project
-                    st.session_state.onboarding_chat = []
-                    st.session_state.use_case_data = {}
-                    st.session_state.collection_step = "name"
-                    return "Perfect! Let's create your new project. What's the name of your project?"
-                elif "EXISTING_USE_CASE" in response_text:
-                    st.session_state.use_case_step = "select_existing"
-                    return "Great! You want to work with an existing project. Let me show you what's available."
-            
-            return response_text
-            
+            response_text = call_claude(prompt, is_data_collection, route, use_cache, _api_key())
+
+        if not is_data_collection and (route or INTENT) == INTENT:
+            return apply_intent(response_text)
+        return response_text
+
     except Exception as e:
         return f"I'm having trouble connecting right now. Error: {str(e)}"
 
-def extract_data_from_claude(prompt, current_step):
-    """Use Claude to extract multiple fields from a user input"""
+def extract_fields(prompt, current_step, collected, api_key=None, on_text=None):
+    """Use Claude to extract multiple fields from a user input, given the ``collected`` fields so far.
+
+    Streamlit-free so it can run as a background chat turn; falls back to
+    storing the input as the current field when no valid result comes back.
+    """
     try:
         # Create context of already collected information
         context = ""
-        if hasattr(st.session_state, 'use_case_data'):
-            collected_info = []
-            for field, value in st.session_state.use_case_data.items():
-                if value and value.strip():
-                    collected_info.append(f"{field}: {value}")
-            
-            if collected_info:
-                context = "Already collected information:\n" + "\n".join(collected_info) + "\n\n"
+        collected_info = []
+        for field, value in collected.items():
+            if value and value.strip():
+                collected_info.append(f"{field}: {value}")
+        
+        if collected_info:
+            context = "Already collected information:\n" + "\n".join(collected_info) + "\n\n"
         
         # Get the response from Claude with the data extraction prompt and context
         enhanced_prompt = context + prompt if context else prompt
-        response = get_claude_response(enhanced_prompt, is_data_collection=True)
+        response = call_claude(enhanced_prompt, is_data_collection=True, api_key=api_key, on_text=on_text)
         
         # Parse Claude's response to get structured data
-        extracted_data = parse_claude_response(response)
+        extracted_data = parse_claude_response(response) if response else None
         
         if extracted_data and "extracted_data" in extracted_data and "next_question" in extracted_data:
             return extracted_data
         
-        # Fallback: If we couldn't extract structured data, just store the current field
-        fallback_response = {
-            "extracted_data": {
-                current_step: prompt.strip()
-            },
-            "next_question": get_next_question(current_step),
-            "missing_fields": get_missing_fields([current_step])
-        }
-        return fallback_response
-        
     except Exception as e:
-        st.error(f"Error extracting data: {str(e)}")
-        # Fallback to storing just the current field
-        return {
-            "extracted_data": {
-                current_step: prompt.strip()
-            },
-            "next_question": get_next_question(current_step),
-            "missing_fields": get_missing_fields([current_step])
-        }
+        logging.error(f"Error extracting data: {str(e)}")
+
+    record_event("extraction_fallback")
+    # Fallback: If we couldn't extract structured data, just store the current field
+    return {
+        "extracted_data": {
+            current_step: prompt.strip()
+        },
+        "next_question": get_next_question(current_step),
+        "missing_fields": get_missing_fields([current_step])
+    }
 
 def get_next_question(current_step):
     """Get the appropriate question for the next step"""
@@ -138,6 +302,13 @@ def get_next_question(current_step):
     else:
         return "What's the name of your project?"  # Default fallback
 
+def get_question_for_field(field):
+    """Get the question that asks for ``field``"""
+    field_order = ["name", "description", "countries", "platforms", "constraints", "criticality"]
+    if field not in field_order or field == "name":
+        return "What's the name of your project?"
+    return get_next_question(field_order[field_order.index(field) - 1])
+
 def get_missing_fields(completed_fields):
     """Get a list of fields that still need to be collected"""
     all_fields = ["name", "description", "countries", "platforms", "constraints", "criticality"]
@@ -188,12 +359,15 @@ def initialize_session_state():
 def parse_claude_response(response):
     """Parse Claude's response to ensure we get valid JSON format"""
     try:
-        # Try to find JSON content in Claude's response
-        json_match = re.search(r'\{[\s\S]*\}', response)
-        if json_match:
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            pass
+        # Otherwise decode the first JSON object embedded in the text
+        start = response.find("{")
+        if start != -1:
             try:
-                # Try to parse the JSON content
-                json_content = json.loads(json_match.group(0))
+                json_content, _ = json.JSONDecoder().raw_decode(response[start:])
                 return json_content
             except json.JSONDecodeError:
                 pass
@@ -202,7 +376,7 @@ def parse_claude_response(response):
     
     return None  # Return None if we couldn't parse JSON
 
-def run_analysis_command(command_name, command_info, solution_path):
+def run_analysis_command(command_name, command_info, solution_path, use_cache=True):
     """Run the selected analysis command using Claude"""
     try:
         with st.spinner(f"🔄 Running {command_name}..."):
@@ -226,7 +400,7 @@ def run_analysis_command(command_name, command_info, solution_path):
             analysis_prompt = f"Based on the following project information, please provide a {command_name.lower()}:\n\n{usecase_content}"
             
             # Get Claude's response
-            response = get_claude_response(analysis_prompt, usecase_content)
+            response = get_claude_response(analysis_prompt, usecase_content, route=ANALYSIS, use_cache=use_cache)
             
             if response and len(response) > 100:
                 output_file = command_info.get('output_file')
@@ -257,15 +431,12 @@ def regenerate_analysis(command_name, command_info, solution_path):
             output_path = os.path.join(solution_path, output_file)
             
             if os.path.exists(output_path):
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                version_name = f"{output_file.replace('.md', '')}_v{timestamp}.md"
-                version_path = os.path.join(solution_path, version_name)
-                import shutil
-                shutil.move(output_path, version_path)
-                st.info(f"📋 Previous version saved as: `{version_name}`")
+                version = get_version_store(solution_path).archive(output_file)
+                if version:
+                    st.info(f"📋 Previous version saved as version `{version}`")
         
-        run_analysis_command(command_name, command_info, solution_path)
+        # A regeneration asks for a new answer, so skip the response cache
+        run_analysis_command(command_name, command_info, solution_path, use_cache=False)
         
     except Exception as e:
         st.error(f"❌ Error regenerating {command_name}: {e}")
@@ -344,6 +515,7 @@ Please provide a comprehensive analysis covering:
         usecase_file = os.path.join(workspace_dir, "usecase.md")
         with open(usecase_file, 'w', encoding='utf-8') as f:
             f.write(prompt)
+        get_catalog().refresh_project(project_name)
         
         # Set as selected solution
         st.session_state.selected_solution = project_name
@@ -359,6 +531,77 @@ Please provide a comprehensive analysis covering:
         st.error(f"Error saving project: {str(e)}")
         return False
 
+def _extraction_turn(prompt, current_step, collected, resolved, api_key=None, on_text=None):
+    """Background chat turn: extract the fields the local fast path could not resolve"""
+    extracted_data = extract_fields(prompt, current_step, collected, api_key, on_text=on_text)
+    # Locally resolved fields take precedence over the model's reading
+    extracted_data.setdefault("extracted_data", {}).update(resolved)
+    return extracted_data
+
+def apply_extraction(extracted_data):
+    """Store extracted fields and add the next question (or create the project once complete)"""
+    required_fields = EXTRACTION_FIELDS
+
+    # Update session state with extracted data
+    if "extracted_data" in extracted_data:
+        for field, value in extracted_data["extracted_data"].items():
+            if field in required_fields and value and value.strip():
+                st.session_state.use_case_data[field] = value.strip()
+    
+    # Recalculate which fields are still missing after updating data
+    completed_fields = [field for field in required_fields if field in st.session_state.use_case_data and st.session_state.use_case_data[field].strip()]
+    missing_fields = [field for field in required_fields if field not in completed_fields]
+    
+    # Check if we've completed all fields
+    if not missing_fields:
+        # All fields collected, generate project
+        completion_message = "🎉 Perfect! I have all the information. Let me create your project..."
+        
+        # Generate and save
+        if generate_and_save_use_case():
+            completion_message += "\n\n✅ Your project has been successfully created and saved! You can now proceed to the other tabs."
+            # Update URL with new project
+            update_url_with_project(st.session_state.selected_solution)
+        else:
+            completion_message = "❌ There was an error creating your project. Please try again."
+        
+        # Add assistant response
+        st.session_state.onboarding_chat.append({"role": "assistant", "content": completion_message})
+    else:
+        # Still need more fields, set next step
+        next_field = get_next_field(missing_fields)
+        st.session_state.collection_step = next_field
+        
+        # Get next question from Claude or use default
+        next_question = extracted_data.get("next_question", get_question_for_field(next_field))
+        
+        # Add assistant response
+        st.session_state.onboarding_chat.append({"role": "assistant", "content": next_question})
+
+@st.fragment(run_every=settings.CHAT_POLL_SECONDS)
+def show_pending_turn():
+    """Pending assistant bubble for a background chat turn; applies the reply once it arrives"""
+    runner = get_chat_runner()
+    turn = runner.get(st.session_state.get("pending_turn_id"))
+    if turn is not None and turn.is_pending:
+        with st.chat_message("assistant"):
+            shown = _display_text(turn.text, turn.kind == "extraction")
+            st.markdown(shown + " ▌" if shown else "…")
+        return
+
+    st.session_state.pending_turn_id = None
+    if turn is not None:
+        runner.pop(turn.id)
+        if turn.kind == "extraction":
+            apply_extraction(turn.result)
+        elif turn.error:
+            st.session_state.onboarding_chat.append({
+                "role": "assistant", "content": f"I'm having trouble connecting right now. Error: {turn.error}"
+            })
+        else:
+            st.session_state.onboarding_chat.append({"role": "assistant", "content": apply_intent(turn.result)})
+    st.rerun()
+
 def interactive_data_collection():
     """Handle interactive data collection using intelligent extraction"""
     # st.markdown("### 🤖 Interactive Project Builder")
@@ -375,6 +618,9 @@ def interactive_data_collection():
     for message in st.session_state.onboarding_chat:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+    pending = st.session_state.get("pending_turn_id")
+    if pending:
+        show_pending_turn()
     
     # Show progress
     required_fields = ["name", "description", "countries", "platforms", "constraints", "criticality"]
@@ -391,52 +637,33 @@ def interactive_data_collection():
                     field_name = field.capitalize()
                     st.markdown(f"**{field_name}**: {st.session_state.use_case_data[field]}")
     
-    # Chat input
-    if prompt := st.chat_input("Your response..."):
+    # Chat input (disabled while a reply is on its way)
+    if prompt := st.chat_input("Your response...", disabled=bool(pending)):
         # Add user message to chat
         st.session_state.onboarding_chat.append({"role": "user", "content": prompt})
         
         # Get current step
         current_step = st.session_state.collection_step
         
-        # Extract data from user input using Claude
-        extracted_data = extract_data_from_claude(prompt, current_step)
-        
-        # Update session state with extracted data
-        if "extracted_data" in extracted_data:
-            for field, value in extracted_data["extracted_data"].items():
-                if field in required_fields and value and value.strip():
-                    st.session_state.use_case_data[field] = value.strip()
-        
-        # Recalculate which fields are still missing after updating data
-        completed_fields = [field for field in required_fields if field in st.session_state.use_case_data and st.session_state.use_case_data[field].strip()]
-        missing_fields = [field for field in required_fields if field not in completed_fields]
-        
-        # Check if we've completed all fields
-        if not missing_fields:
-            # All fields collected, generate project
-            completion_message = "🎉 Perfect! I have all the information. Let me create your project..."
-            
-            # Generate and save
-            if generate_and_save_use_case():
-                completion_message += "\n\n✅ Your project has been successfully created and saved! You can now proceed to the other tabs."
-                # Update URL with new project
-                update_url_with_project(st.session_state.selected_solution)
-            else:
-                completion_message = "❌ There was an error creating your project. Please try again."
-            
-            # Add assistant response
-            st.session_state.onboarding_chat.append({"role": "assistant", "content": completion_message})
+        # Resolve plain answers (countries, platforms, criticality) locally first
+        call = start_call(EXTRACTION, model="local")
+        fast = fast_extract.extract(prompt, current_step)
+        resolved = fast.resolved(settings.FAST_EXTRACT_MIN_CONFIDENCE)
+        st.session_state.use_case_data.update(resolved)
+        if resolved and not fast.residual:
+            # The whole message is explained; no LLM round trip needed
+            call.finish(True)
+            apply_extraction({"extracted_data": resolved})
         else:
-            # Still need more fields, set next step
-            next_field = get_next_field(missing_fields)
-            st.session_state.collection_step = next_field
-            
-            # Get next question from Claude or use default
-            next_question = extracted_data.get("next_question", get_next_question(next_field))
-            
-            # Add assistant response
-            st.session_state.onboarding_chat.append({"role": "assistant", "content": next_question})
+            # The local pass still ran; it succeeded if it resolved anything
+            call.finish(bool(resolved))
+            # Extract the remaining fields using Claude on a background thread so the page stays
+            # interactive. Locally resolved fields are already in use_case_data, so they are passed as context.
+            turn = get_chat_runner().submit(
+                "extraction", _extraction_turn, prompt, current_step,
+                dict(st.session_state.use_case_data), resolved, api_key=_api_key()
+            )
+            st.session_state.pending_turn_id = turn.id
         
         st.rerun()
 
@@ -506,15 +733,18 @@ def ask_use_case_type():
         for message in st.session_state.onboarding_chat:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+        pending = st.session_state.get("pending_turn_id")
+        if pending:
+            show_pending_turn()
         
-        # Chat input
-        if prompt := st.chat_input("Tell me what you'd like to do..."):
+        # Chat input (disabled while a reply is on its way)
+        if prompt := st.chat_input("Tell me what you'd like to do...", disabled=bool(pending)):
             # Add user message
             st.session_state.onboarding_chat.append({"role": "user", "content": prompt})
             
-            # Get Claude's response
-            response = get_claude_response(prompt)
-            st.session_state.onboarding_chat.append({"role": "assistant", "content": response})
+            # Get Claude's response on a background thread; the pending bubble streams it in
+            turn = get_chat_runner().submit("intent", call_claude, prompt, api_key=_api_key())
+            st.session_state.pending_turn_id = turn.id
             
             st.rerun()
     
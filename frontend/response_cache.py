@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+import settings
+
+
+DB_PATH = os.path.join(settings.STATE_DIR, "responses.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def request_key(model, system, messages, temperature) -> str:
+    """Cache key of a Messages API request."""
+    payload = json.dumps(
+        {"model": model, "system": system, "messages": messages, "temperature": temperature},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk LRU cache of LLM responses with a TTL and a total size budget.
+
+    Entries older than ``ttl_seconds`` are never served; when the stored
+    responses exceed ``max_bytes`` the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _count(conn, name: str) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str):
+        """Cached response for ``key``, or None on a miss (expired entries are dropped)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                    if row is not None and now - row["created_at"] > self.ttl_seconds:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        row = None
+                    if row is None:
+                        self._count(conn, "misses")
+                        return None
+                    conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+                    self._count(conn, "hits")
+                    return row["response"]
+            finally:
+                conn.close()
+
+    def put(self, key: str, response: str) -> None:
+        """Store ``response`` under ``key`` and evict least recently used entries over budget."""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, response, size, now, now),
+                    )
+                    conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+                    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                    if total > self.max_bytes:
+                        evicted = 0
+                        for row in conn.execute("SELECT key, size FROM responses ORDER BY last_used_at").fetchall():
+                            if total <= self.max_bytes:
+                                break
+                            conn.execute("DELETE FROM responses WHERE key = ?", (row["key"],))
+                            total -= row["size"]
+                            evicted += 1
+                        conn.execute(
+                            "INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+                            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                            (evicted,),
+                        )
+            finally:
+                conn.close()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters plus the current number and size of entries."""
+        conn = self._connect()
+        try:
+            counters = {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM counters")}
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        finally:
+            conn.close()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(DB_PATH, settings.RESPONSE_CACHE_TTL_SECONDS, settings.RESPONSE_CACHE_MAX_BYTES)
+        return _cache
@@ -0,0 +1,266 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+import zlib
+from typing import Callable, NamedTuple
+
+import settings
+from version_store import VersionStore, STORE_DIR, LEGACY_VERSION_RE
+
+
+DB_PATH = os.path.join(settings.STATE_DIR, "search.db")
+WORKSPACE_DIR = "../workspace"
+# A quoted phrase (closing quote optional) or a bare word
+_TERM_RE = re.compile(r'"(?P<phrase>[^"]*)"?|(?P<word>[^\s"]+)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    usecase TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    version TEXT,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_usecase ON documents (usecase);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    artifact, body, tokenize = 'porter unicode61'
+);
+"""
+
+
+class SearchHit(NamedTuple):
+    usecase: str
+    artifact: str       # e.g. "ra-sdd.md"; versions keep the current artifact's name
+    version: str        # "YYYYMMDD_HHMMSS" for a saved version, None for the current file
+    path: str           # relative to the workspace; ``<usecase>/.versions/<artifact>@<version>`` for stored versions
+    snippet: str        # matches wrapped in ** for markdown
+    score: float        # bm25, lower is better
+
+
+class _Source(NamedTuple):
+    usecase: str
+    artifact: str
+    version: str
+    mtime: float
+    size: int
+    sha256: str         # known up front for stored revisions, None for files
+    read: Callable[[], bytes]
+
+
+def _file_reader(path: str):
+    def read() -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+    return read
+
+
+def _revision_reader(store: VersionStore, artifact: str, version: str):
+    return lambda: store.read(artifact, version).encode("utf-8")
+
+
+def to_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every term must match, ``word*`` is a prefix match.
+
+    ``"data retention"`` is a phrase: its words must appear next to each other
+    in that order. Terms are quoted, so punctuation such as ``ra-fr`` or
+    ``C++`` is never parsed as query syntax; an unbalanced quote runs to the
+    end of the text.
+    """
+    terms = []
+    for match in _TERM_RE.finditer(text):
+        phrase, word = match["phrase"], match["word"]
+        if phrase is not None:
+            phrase = " ".join(phrase.split())
+            if phrase:
+                terms.append(f'"{phrase}"')
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """SQLite FTS5 index over every markdown artifact in the workspace and its stored versions.
+
+    ``refresh`` re-reads only documents whose mtime or size changed, and only
+    re-indexes them when their content hash changed; deleted documents are
+    dropped. It runs at most once every ``SEARCH_REFRESH_SECONDS`` unless
+    forced. Results are ranked with bm25 and come with highlighted snippets.
+    """
+
+    def __init__(self, path: str, workspace_dir: str):
+        self.path = path
+        self.workspace_dir = workspace_dir
+        self._lock = threading.Lock()
+        self._refreshed_at = float("-inf")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _scan(self) -> dict:
+        """Relative path -> _Source for every top-level markdown file and stored revision of every project."""
+        found = {}
+        if not os.path.isdir(self.workspace_dir):
+            return found
+        with os.scandir(self.workspace_dir) as projects:
+            for project in projects:
+                if not project.is_dir() or project.name.startswith("."):
+                    continue
+                store = VersionStore(project.path)
+                try:
+                    imported = store.imported_files()
+                    stored_versions = store.all_versions()
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Search index skipped the versions of {project.name}: {e}")
+                    imported, stored_versions = set(), {}
+                with os.scandir(project.path) as entries:
+                    for entry in entries:
+                        # Legacy copies already in the version store are indexed as stored revisions
+                        if entry.name.endswith(".md") and entry.name not in imported and entry.is_file():
+                            match = LEGACY_VERSION_RE.match(entry.name)
+                            artifact, version = (f"{match['base']}.md", match["version"]) if match else (entry.name, None)
+                            stat = entry.stat()
+                            found[f"{project.name}/{entry.name}"] = _Source(
+                                project.name, artifact, version, stat.st_mtime, stat.st_size, None, _file_reader(entry.path)
+                            )
+                for artifact, revisions in stored_versions.items():
+                    for r in revisions:
+                        found[f"{project.name}/{STORE_DIR}/{artifact}@{r['version']}"] = _Source(
+                            project.name, artifact, r["version"], r["created_at"], r["size"], r["sha256"],
+                            _revision_reader(store, artifact, r["version"]),
+                        )
+        return found
+
+    def _index_locked(self, conn, rel: str, source, stored) -> bool:
+        """(Re)index one document; returns False when only its metadata changed."""
+        data = None
+        digest = source.sha256
+        if digest is None:
+            data = source.read()
+            digest = hashlib.sha256(data).hexdigest()
+        if stored is not None and stored["sha256"] == digest:
+            conn.execute("UPDATE documents SET mtime = ?, size = ? WHERE id = ?", (source.mtime, source.size, stored["id"]))
+            return False
+        body = (data if data is not None else source.read()).decode("utf-8", errors="replace")
+        if stored is not None:
+            conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (stored["id"],))
+            conn.execute(
+                "UPDATE documents SET mtime = ?, size = ?, sha256 = ? WHERE id = ?",
+                (source.mtime, source.size, digest, stored["id"]),
+            )
+            doc_id = stored["id"]
+        else:
+            doc_id = conn.execute(
+                "INSERT INTO documents (path, usecase, artifact, version, mtime, size, sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rel, source.usecase, source.artifact, source.version, source.mtime, source.size, digest),
+            ).lastrowid
+        conn.execute("INSERT INTO documents_fts (rowid, artifact, body) VALUES (?, ?, ?)", (doc_id, source.artifact, body))
+        return True
+
+    def refresh(self, force: bool = False) -> int:
+        """Bring the index up to date with the workspace; returns how many documents were (re)indexed."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < settings.SEARCH_REFRESH_SECONDS:
+                return 0
+            self._refreshed_at = now
+            started = time.time()
+            found = self._scan()
+            indexed = 0
+            conn = self._connect()
+            try:
+                with conn:
+                    stored = {row["path"]: row for row in conn.execute("SELECT id, path, mtime, size, sha256 FROM documents")}
+                    for rel, source in found.items():
+                        row = stored.get(rel)
+                        if row is not None and row["mtime"] == source.mtime and row["size"] == source.size:
+                            continue
+                        try:
+                            indexed += self._index_locked(conn, rel, source, row)
+                        except (OSError, KeyError, zlib.error) as e:
+                            logging.warning(f"Search index skipped {rel}: {e}")
+                    gone = [stored[rel]["id"] for rel in stored.keys() - found.keys()]
+                    conn.executemany("DELETE FROM documents_fts WHERE rowid = ?", [(i,) for i in gone])
+                    conn.executemany("DELETE FROM documents WHERE id = ?", [(i,) for i in gone])
+            finally:
+                conn.close()
+            if indexed or gone:
+                logging.info(f"Search index: {indexed} indexed, {len(gone)} removed in {time.time() - started:.2f}s")
+            return indexed
+
+    def search(self, text: str, usecase: str = None, include_versions: bool = True, limit: int = 20, offset: int = 0):
+        """Ranked hits for the words in ``text`` and the total number of matching documents."""
+        match = to_match_query(text)
+        if not match:
+            return [], 0
+        where = "documents_fts MATCH ?"
+        params = [match]
+        if usecase:
+            where += " AND d.usecase = ?"
+            params.append(usecase)
+        if not include_versions:
+            where += " AND d.version IS NULL"
+        conn = self._connect()
+        try:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid WHERE {where}",
+                params,
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"""SELECT d.usecase, d.artifact, d.version, d.path,
+                           snippet(documents_fts, 1, '**', '**', ' … ', 24) AS snippet,
+                           bm25(documents_fts, 5.0, 1.0) AS score
+                    FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                    WHERE {where}
+                    ORDER BY score LIMIT ? OFFSET ?""",
+                params + [limit, offset],
+            ).fetchall()
+        finally:
+            conn.close()
+        return [SearchHit(r["usecase"], r["artifact"], r["version"], r["path"], r["snippet"], r["score"]) for r in rows], total
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COUNT(*) AS documents, COUNT(DISTINCT usecase) AS usecases FROM documents").fetchone()
+        finally:
+            conn.close()
+        return {"documents": row["documents"], "usecases": row["usecases"]}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Return the process-wide artifact search index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex(DB_PATH, WORKSPACE_DIR)
+        return _index
+
+
+def search(text: str, usecase: str = None, include_versions: bool = True, limit: int = 20, offset: int = 0):
+    """Refresh the shared index if due and search it; returns (hits, total)."""
+    index = get_search_index()
+    index.refresh()
+    return index.search(text, usecase=usecase, include_versions=include_versions, limit=limit, offset=offset)
@@ -0,0 +1,106 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer from the environment, falling back to ``default``."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to ``default``."""
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Directory holding process-wide runtime state (job logs, caches, indexes).
+STATE_DIR = os.environ.get("PILOT_STATE_DIR", "../.pilot")
+
+# Background job engine
+JOB_WORKERS = _env_int("PILOT_JOB_WORKERS", 16)
+JOB_HISTORY_LIMIT = _env_int("PILOT_JOB_HISTORY_LIMIT", 200)
+
+# Admission control for backend CLI processes (shared by all sessions)
+CLI_MAX_CONCURRENT = _env_int("PILOT_CLI_MAX_CONCURRENT", 4)
+CLI_RATE_PER_MINUTE = _env_int("PILOT_CLI_RATE_PER_MINUTE", 30)
+CLI_RATE_BURST = _env_int("PILOT_CLI_RATE_BURST", 5)
+
+# Run logs are spooled to disk; only a bounded tail is kept in memory and rendered
+JOB_LOG_TAIL_LINES = _env_int("PILOT_JOB_LOG_TAIL_LINES", 200)
+JOB_LOG_READ_BYTES = _env_int("PILOT_JOB_LOG_READ_BYTES", 64 * 1024)
+LOG_VIEW_CHARS = _env_int("PILOT_LOG_VIEW_CHARS", 6000)
+
+# Refresh interval (seconds) of the timer-driven progress fragments
+PROGRESS_REFRESH_SECONDS = _env_int("PILOT_PROGRESS_REFRESH_SECONDS", 1)
+
+# "Generate all" pipeline: default number of commands run concurrently
+PIPELINE_PARALLELISM = _env_int("PILOT_PIPELINE_PARALLELISM", 4)
+
+# Generation backend: "cli" shells out to the claude CLI, "sdk" runs prompts in-process.
+# commands.md entries can override this per command with backend=cli|sdk.
+GENERATION_BACKEND = os.environ.get("PILOT_GENERATION_BACKEND", "cli")
+SDK_MODEL = os.environ.get("PILOT_SDK_MODEL", "claude-opus-4-1-20250805")
+SDK_MAX_TOKENS = _env_int("PILOT_SDK_MAX_TOKENS", 16000)
+
+# Prompt caching of the shared use case prefix in the SDK path: concurrent runs wait up
+# to SDK_PROMPT_CACHE_WAIT_SECONDS for the first request to write the cache entry
+SDK_PROMPT_CACHE_TTL_SECONDS = _env_int("PILOT_SDK_PROMPT_CACHE_TTL_SECONDS", 270)
+SDK_PROMPT_CACHE_WAIT_SECONDS = _env_int("PILOT_SDK_PROMPT_CACHE_WAIT_SECONDS", 30)
+# Shortest prefix the API will cache (1024 tokens for Opus/Sonnet, 2048 for Haiku); shorter
+# prefixes are sent without a cache breakpoint and without waiting for a primer
+SDK_PROMPT_CACHE_MIN_TOKENS = _env_int("PILOT_SDK_PROMPT_CACHE_MIN_TOKENS", 1024)
+
+# Onboarding model routes: a small fast model for field extraction and the NEW/EXISTING
+# intent decision, the large model only for analysis. Each route can be overridden.
+FAST_MODEL = os.environ.get("PILOT_FAST_MODEL", "claude-3-5-haiku-20241022")
+LARGE_MODEL = os.environ.get("PILOT_LARGE_MODEL", "claude-opus-4-1-20250805")
+MODEL_ROUTES = {
+    "extraction": os.environ.get("PILOT_MODEL_EXTRACTION", FAST_MODEL),
+    "intent": os.environ.get("PILOT_MODEL_INTENT", FAST_MODEL),
+    "analysis": os.environ.get("PILOT_MODEL_ANALYSIS", LARGE_MODEL),
+}
+ONBOARDING_MAX_TOKENS = _env_int("PILOT_ONBOARDING_MAX_TOKENS", 1024)
+
+# Onboarding fields resolved locally (countries, platforms, criticality) at or above this
+# confidence skip the extraction LLM call
+FAST_EXTRACT_MIN_CONFIDENCE = _env_float("PILOT_FAST_EXTRACT_MIN_CONFIDENCE", 0.8)
+
+# Persistent LRU+TTL cache of onboarding/analysis LLM responses
+RESPONSE_CACHE_ENABLED = os.environ.get("PILOT_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_TTL_SECONDS = _env_int("PILOT_RESPONSE_CACHE_TTL_SECONDS", 7 * 86400)
+RESPONSE_CACHE_MAX_BYTES = _env_int("PILOT_RESPONSE_CACHE_MAX_BYTES", 50 * 1024 * 1024)
+
+# Onboarding chat turns run on a background pool; the pending reply is polled at this interval
+CHAT_WORKERS = _env_int("PILOT_CHAT_WORKERS", 8)
+CHAT_POLL_SECONDS = _env_float("PILOT_CHAT_POLL_SECONDS", 0.5)
+
+# Documentation toolchain: optional pre-provisioned virtualenv holding mkdocs and its plugins.
+# When unset, the packages are checked (and installed if missing) in the app's own environment.
+DOCS_VENV = os.environ.get("PILOT_DOCS_VENV", "")
+
+# Shared static documentation server: serves every built _ra/site under /docs/<usecase>/
+DOCS_SERVER_HOST = os.environ.get("PILOT_DOCS_SERVER_HOST", "127.0.0.1")
+DOCS_SERVER_PORT = _env_int("PILOT_DOCS_SERVER_PORT", 8005)
+DOCS_PUBLIC_HOST = os.environ.get("PILOT_DOCS_PUBLIC_HOST", "localhost")
+DOCS_REBUILD_CHECK_SECONDS = _env_int("PILOT_DOCS_REBUILD_CHECK_SECONDS", 2)
+
+# mkdocs serve live previews: process-wide registry with probed ports and an idle/dead-process reaper
+PREVIEW_PORT_BASE = _env_int("PILOT_PREVIEW_PORT_BASE", DOCS_SERVER_PORT + 1)
+PREVIEW_PORT_RANGE = _env_int("PILOT_PREVIEW_PORT_RANGE", 100)
+PREVIEW_START_TIMEOUT_SECONDS = _env_int("PILOT_PREVIEW_START_TIMEOUT_SECONDS", 60)
+PREVIEW_IDLE_SECONDS = _env_int("PILOT_PREVIEW_IDLE_SECONDS", 1800)
+PREVIEW_REAP_INTERVAL_SECONDS = _env_int("PILOT_PREVIEW_REAP_INTERVAL_SECONDS", 30)
+
+# Workspace catalog (SQLite index of projects for the Dashboard)
+CATALOG_REFRESH_SECONDS = _env_int("PILOT_CATALOG_REFRESH_SECONDS", 5)
+
+# Full-text search index over workspace artifacts
+SEARCH_REFRESH_SECONDS = _env_int("PILOT_SEARCH_REFRESH_SECONDS", 5)
+
+# Artifact version store (<usecase>/.versions): retention per artifact; 0 days keeps versions regardless of age
+VERSION_KEEP = _env_int("PILOT_VERSION_KEEP", 20)
+VERSION_MAX_AGE_DAYS = _env_int("PILOT_VERSION_MAX_AGE_DAYS", 0)
@@ -0,0 +1,37 @@
+import os
+
+from search_index import SearchIndex, to_match_query
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _index(tmp_path):
+    workspace = tmp_path / "workspace"
+    _write(workspace / "alpha" / "ra-nfr.md", "# NFR\n\nThe data retention period is seven years.\n")
+    _write(workspace / "beta" / "ra-nfr.md", "# NFR\n\nA retention policy applies to the data lake.\n")
+    index = SearchIndex(str(tmp_path / "search.db"), str(workspace))
+    index.refresh(force=True)
+    return index
+
+
+def test_quoted_text_is_one_phrase():
+    assert to_match_query('"data retention"') == '"data retention"'
+    assert to_match_query('GDPR "data  retention" auth*') == '"GDPR" "data retention" "auth"*'
+    assert to_match_query('"unterminated phrase') == '"unterminated phrase"'
+    assert to_match_query('ra-fr C++') == '"ra-fr" "C++"'
+    assert to_match_query('"" *') == ""
+
+
+def test_phrase_search_needs_adjacent_words(tmp_path):
+    index = _index(tmp_path)
+
+    hits, total = index.search('"data retention"')
+    assert total == 1
+    assert hits[0].usecase == "alpha"
+
+    _, total = index.search("data retention")
+    assert total == 2
@@ -0,0 +1,89 @@
+import os
+
+import settings
+from version_store import VersionStore, LEGACY_VERSION_RE, STORE_DIR
+
+
+def _write(path, text, mtime=None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _objects(store):
+    return set(os.listdir(os.path.join(store.root, "objects")))
+
+
+def test_restore_keeps_the_revision_it_saves(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_KEEP", 3)
+    store = VersionStore(str(tmp_path))
+    working = tmp_path / "ra-fr.md"
+    # Three stored revisions, dated 2025
+    for day in range(1, 4):
+        _write(working, f"revision {day}", mtime=1735689600 + day * 86400)
+        store.archive("ra-fr.md")
+    # An edit whose file date is older than every stored revision
+    _write(working, "edited offline", mtime=1700000000)
+
+    restored = store.versions("ra-fr.md")[0]["version"]
+    saved = store.restore("ra-fr.md", restored)
+
+    versions = {r["version"] for r in store.versions("ra-fr.md")}
+    assert saved in versions
+    assert store.read("ra-fr.md", saved) == "edited offline"
+    assert len(versions) == 3
+    revision = next(r for r in store.versions("ra-fr.md") if r["version"] == saved)
+    assert f"{revision['sha256']}.z" in _objects(store)
+
+
+def test_retention_drops_the_earliest_stored_revisions(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_KEEP", 2)
+    store = VersionStore(str(tmp_path))
+    working = tmp_path / "ra-nfr.md"
+    # Stored in this order, with file dates running backwards
+    for n, mtime in enumerate([1735689600, 1704067200, 1672531200]):
+        _write(working, f"revision {n}", mtime=mtime)
+        store.archive("ra-nfr.md")
+
+    kept = sorted(store.read("ra-nfr.md", r["version"]) for r in store.versions("ra-nfr.md"))
+    assert kept == ["revision 1", "revision 2"]
+
+
+def test_legacy_copies_are_imported_once_and_left_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VERSION_KEEP", 1)
+    legacy = ["ra-fr_v20250101_000000.md", "ra-fr_v20250201_000000.md"]
+    for n, name in enumerate(legacy):
+        assert LEGACY_VERSION_RE.match(name)
+        _write(tmp_path / name, f"legacy {n}")
+    store = VersionStore(str(tmp_path))
+
+    assert store.migrate_legacy() == 2
+    assert all((tmp_path / name).exists() for name in legacy)
+    assert store.imported_files() == set(legacy)
+
+    assert store.migrate_legacy() == 0
+
+    # Imported revisions neither expire nor use up the retention budget
+    working = tmp_path / "ra-fr.md"
+    for n in range(3):
+        _write(working, f"generated {n}")
+        store.archive("ra-fr.md")
+    contents = {store.read("ra-fr.md", r["version"]) for r in store.versions("ra-fr.md")}
+    assert contents == {"legacy 0", "legacy 1", "generated 2"}
+    assert (tmp_path / STORE_DIR / "index.json").exists()
+
+
+def test_manifest_picks_up_reports_changed_outside_the_app(tmp_path):
+    store = VersionStore(str(tmp_path))
+    assert store.manifest() == {}
+
+    _write(tmp_path / "ra-sdd.md", "written by the CLI")
+    current = store.manifest()["ra-sdd.md"]["current"]
+    assert current["size"] == len("written by the CLI")
+
+    _write(tmp_path / "ra-sdd.md", "edited by hand", mtime=1700000000)
+    assert store.manifest()["ra-sdd.md"]["current"]["sha256"] != current["sha256"]
+
+    os.remove(tmp_path / "ra-sdd.md")
+    assert store.manifest()["ra-sdd.md"]["current"] is None
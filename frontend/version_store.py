@@ -0,0 +1,419 @@
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import logging
+import datetime
+import threading
+
+import settings
+
+
+STORE_DIR = ".versions"
+INDEX_NAME = "index.json"
+OBJECTS_DIR = "objects"
+# Legacy full-copy versions: ra-fr_v20250901_231319.md next to ra-fr.md
+LEGACY_VERSION_RE = re.compile(r"^(?P<base>.+)_v(?P<version>\d{8}_\d{6})\.md$")
+
+# Origins of working files and revisions
+GENERATED = "generated"
+RESTORED = "restored"
+IMPORTED = "imported"
+
+
+def _timestamp(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts).strftime("%Y%m%d_%H%M%S")
+
+
+def format_version(version: str) -> str:
+    """``20250901_231319`` -> ``2025-09-01 23:13:19`` (suffixes such as ``-2`` are kept)."""
+    stamp, _, suffix = version.partition("-")
+    pretty = f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]} {stamp[9:11]}:{stamp[11:13]}:{stamp[13:15]}"
+    return f"{pretty} ({suffix})" if suffix else pretty
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def describe_version(revision: dict) -> str:
+    """Picker label of a stored revision, e.g. ``Version 20250901_231319 · 14.3 KB · imported``."""
+    return f"Version {revision['version']} · {_format_size(revision['size'])} · {revision['origin']}"
+
+
+def describe_current(current: dict) -> str:
+    """Short description of a manifest's working-file record."""
+    when = datetime.datetime.fromtimestamp(current["modified_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    if current["origin"] == RESTORED:
+        origin = f"restored from version {current['restored_from']} on {when}"
+    else:
+        origin = f"{current['origin']} on {when}"
+    return f"{origin} · {_format_size(current['size'])}"
+
+
+class VersionStore:
+    """Per-use-case store of artifact revisions under ``<usecase>/.versions``.
+
+    Each revision is a zlib-compressed object named by the sha256 of its
+    content, so identical revisions (e.g. the backup taken when restoring)
+    cost nothing extra. ``index.json`` is the use case's version manifest:
+    every artifact's revisions, a record of its working file (``ra-fr.md``:
+    hash, size, time and whether it was generated or restored) and its head,
+    the revision the working file currently holds.
+    Restoring writes the chosen revision to the working file and moves the
+    head instead of keeping another full copy. Revisions beyond the
+    ``VERSION_KEEP`` most recently stored per artifact, or stored more than
+    ``VERSION_MAX_AGE_DAYS`` ago, are garbage collected; the head and the
+    revision an archive or restore has just saved are never collected.
+    """
+
+    def __init__(self, usecase_path: str):
+        self.usecase_path = usecase_path
+        self.root = os.path.join(usecase_path, STORE_DIR)
+        self._lock = _lock_for(usecase_path)
+
+    # --- Index ---
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX_NAME)
+
+    def _load(self) -> dict:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {"artifacts": {}, "imported": []}
+        index.setdefault("imported", [])
+        for entry in index["artifacts"].values():
+            if "next_seq" not in entry:
+                # Indexes written before revisions had a storage sequence: keep their order
+                for seq, revision in enumerate(entry["revisions"], start=1):
+                    revision.setdefault("seq", seq)
+                    revision.setdefault("stored_at", revision["created_at"])
+                entry["next_seq"] = len(entry["revisions"]) + 1
+        return index
+
+    def _save(self, index: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._index_path()
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, path)
+
+    # --- Objects ---
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.root, OBJECTS_DIR, f"{sha}.z")
+
+    def _put_object(self, data: bytes):
+        """Store ``data`` if it is new; returns (sha256, compressed size)."""
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha)
+        if os.path.exists(path):
+            return sha, os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 9)
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp, path)
+        return sha, len(compressed)
+
+    def _get_object(self, sha: str) -> bytes:
+        with open(self._object_path(sha), "rb") as f:
+            return zlib.decompress(f.read())
+
+    # --- Revisions ---
+    @staticmethod
+    def _add_revision(entry: dict, sha: str, size: int, stored_size: int, created_at: float, origin: str, version=None) -> dict:
+        """Add a revision; ``created_at`` dates its content, ``seq``/``stored_at`` record when it was stored."""
+        version = version or _timestamp(created_at)
+        taken = {r["version"] for r in entry["revisions"]}
+        unique, n = version, 2
+        while unique in taken:
+            unique, n = f"{version}-{n}", n + 1
+        seq = entry.get("next_seq", 1)
+        entry["next_seq"] = seq + 1
+        revision = {
+            "version": unique, "sha256": sha, "size": size, "stored_size": stored_size,
+            "created_at": created_at, "origin": origin, "seq": seq, "stored_at": time.time(),
+        }
+        entry["revisions"].append(revision)
+        entry["revisions"].sort(key=lambda r: r["created_at"])
+        return revision
+
+    def _working_path(self, artifact: str) -> str:
+        return os.path.join(self.usecase_path, artifact)
+
+    @staticmethod
+    def _entry(index: dict, artifact: str) -> dict:
+        return index["artifacts"].setdefault(
+            artifact, {"artifact": artifact, "head": None, "current": None, "revisions": [], "next_seq": 1}
+        )
+
+    def _record_current_locked(self, entry: dict, origin: str, data: bytes = None, restored_from: str = None) -> None:
+        """Describe the working file in the manifest and point the head at the revision it matches, if any."""
+        entry.pop("head_stat", None)
+        path = self._working_path(entry["artifact"])
+        try:
+            stat = os.stat(path)
+            if data is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+        except FileNotFoundError:
+            entry["current"], entry["head"] = None, None
+            return
+        sha = hashlib.sha256(data).hexdigest()
+        entry["current"] = {
+            "sha256": sha, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "modified_at": stat.st_mtime,
+            "origin": origin, "restored_from": restored_from,
+        }
+        entry["head"] = next((r["version"] for r in reversed(entry["revisions"]) if r["sha256"] == sha), None)
+
+    def _current_locked(self, entry: dict):
+        """The manifest's record of the working file, re-recorded if the file changed outside the app."""
+        current = entry.get("current")
+        try:
+            stat = os.stat(self._working_path(entry["artifact"]))
+        except FileNotFoundError:
+            entry["current"], entry["head"] = None, None
+            return None
+        if current is None or [current["mtime_ns"], current["size"]] != [stat.st_mtime_ns, stat.st_size]:
+            self._record_current_locked(entry, GENERATED)
+        return entry["current"]
+
+    def _snapshot_locked(self, index: dict, artifact: str):
+        """Store the working file as a revision unless it already is one; returns its version or None."""
+        entry = self._entry(index, artifact)
+        current = self._current_locked(entry)
+        if current is None:
+            return None
+        if entry["head"]:
+            return entry["head"]
+        with open(self._working_path(artifact), "rb") as f:
+            data = f.read()
+        sha, stored_size = self._put_object(data)
+        revision = self._add_revision(entry, sha, len(data), stored_size, current["modified_at"], current["origin"])
+        entry["head"] = revision["version"]
+        return revision["version"]
+
+    def archive(self, artifact: str, remove: bool = True):
+        """Save the working file as a revision (before it is regenerated); returns the version or None.
+
+        With ``remove`` the working file is deleted afterwards, as the
+        generators only write reports that do not exist yet.
+        """
+        with self._lock:
+            index = self._load()
+            version = self._snapshot_locked(index, artifact)
+            entry = index["artifacts"][artifact]
+            if remove and version:
+                os.remove(self._working_path(artifact))
+                entry["current"], entry["head"] = None, None
+            self._gc_locked(index, protect={(artifact, version)})
+            self._save(index)
+            return version
+
+    def restore(self, artifact: str, version: str) -> str:
+        """Make ``version`` the working file and head; returns the version the previous file was saved as."""
+        with self._lock:
+            index = self._load()
+            saved = self._snapshot_locked(index, artifact)
+            entry = index["artifacts"][artifact]
+            revision = next((r for r in entry["revisions"] if r["version"] == version), None)
+            if revision is None:
+                raise KeyError(f"{artifact} has no version {version}")
+            data = self._get_object(revision["sha256"])
+            path = self._working_path(artifact)
+            tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._record_current_locked(entry, RESTORED, data=data, restored_from=version)
+            # The revision just saved is what the user is told to go back to; never collect it here
+            self._gc_locked(index, protect={(artifact, saved)})
+            self._save(index)
+            return saved
+
+    def record_current(self, artifact: str, origin: str = GENERATED) -> None:
+        """Update the manifest after ``artifact``'s working file was written (or removed)."""
+        with self._lock:
+            index = self._load()
+            self._record_current_locked(self._entry(index, artifact), origin)
+            self._save(index)
+
+    def _reconcile_locked(self, index: dict) -> None:
+        """Re-record working files added, changed or removed outside the app, saving the index if any were.
+
+        Costs a directory listing and a stat per report; only files whose
+        mtime or size changed are read and hashed again.
+        """
+        if not os.path.isdir(self.usecase_path):
+            return
+        artifacts = set(index["artifacts"]) | {
+            name for name in os.listdir(self.usecase_path)
+            if name.startswith("ra-") and name.endswith(".md") and not LEGACY_VERSION_RE.match(name)
+        }
+        before = json.dumps(index, sort_keys=True)
+        for artifact in artifacts:
+            self._current_locked(self._entry(index, artifact))
+        if json.dumps(index, sort_keys=True) != before:
+            self._save(index)
+
+    def reconcile(self) -> None:
+        """Re-record working files that were added, changed or removed outside the app."""
+        with self._lock:
+            self._reconcile_locked(self._load())
+
+    def manifest(self) -> dict:
+        """Everything the version pickers need, from one read of ``index.json``.
+
+        Working files are reconciled first, so reports written by a CLI run,
+        git or a hand edit show up without restarting the app.
+
+        Artifact -> ``current`` (sha256, size, modified_at, origin and
+        restored_from of the working file, or None), ``head`` (the version
+        it matches, or None) and ``versions`` (the other revisions, newest
+        first, each with version, size, stored_size, created_at, origin and
+        sha256).
+        """
+        with self._lock:
+            index = self._load()
+            self._reconcile_locked(index)
+        return {
+            artifact: {
+                "current": entry.get("current"),
+                "head": entry.get("head"),
+                "versions": [r for r in reversed(entry["revisions"]) if r["version"] != entry.get("head")],
+            }
+            for artifact, entry in index["artifacts"].items()
+        }
+
+    def all_versions(self) -> dict:
+        """Artifact -> its revisions, newest first, from a single read of the index."""
+        return {artifact: list(reversed(entry["revisions"])) for artifact, entry in self._load()["artifacts"].items()}
+
+    def versions(self, artifact: str) -> list:
+        """Revisions of ``artifact``, newest first: dicts with version, size, stored_size, created_at, origin, sha256."""
+        entry = self._load()["artifacts"].get(artifact)
+        return list(reversed(entry["revisions"])) if entry else []
+
+    def head(self, artifact: str):
+        """Version the working file holds, or None if it was regenerated or edited since."""
+        entry = self._load()["artifacts"].get(artifact)
+        return entry.get("head") if entry else None
+
+    def read(self, artifact: str, version: str) -> str:
+        entry = self._load()["artifacts"].get(artifact) or {"revisions": []}
+        revision = next((r for r in entry["revisions"] if r["version"] == version), None)
+        if revision is None:
+            raise KeyError(f"{artifact} has no version {version}")
+        return self._get_object(revision["sha256"]).decode("utf-8")
+
+    # --- Retention ---
+    def _gc_locked(self, index: dict, protect=()) -> int:
+        """Apply the retention policy and delete unreferenced objects; returns how many revisions were dropped.
+
+        Retention follows the order revisions were stored in, not their
+        content dates: the ``VERSION_KEEP`` most recently stored revisions
+        of each artifact survive. Its head and any ``(artifact, version)`` in
+        ``protect`` always survive and count towards that number.
+        Revisions imported from legacy ``_v`` copies are never collected nor
+        counted: the copies stay on disk, and dropping their revision would
+        hide them from the pickers and search.
+        """
+        dropped = 0
+        cutoff = time.time() - settings.VERSION_MAX_AGE_DAYS * 86400 if settings.VERSION_MAX_AGE_DAYS else None
+        for artifact, entry in index["artifacts"].items():
+            head = entry.get("head")
+            kept, retained = set(), 0
+            for revision in sorted(entry["revisions"], key=lambda r: r["seq"], reverse=True):
+                if revision["origin"] == IMPORTED:
+                    kept.add(revision["version"])
+                    continue
+                expired = cutoff is not None and revision["stored_at"] < cutoff
+                pinned = revision["version"] == head or (artifact, revision["version"]) in protect
+                if pinned or (retained < settings.VERSION_KEEP and not expired):
+                    kept.add(revision["version"])
+                    retained += 1
+            dropped += len(entry["revisions"]) - len(kept)
+            entry["revisions"] = [r for r in entry["revisions"] if r["version"] in kept]
+
+        referenced = {r["sha256"] for entry in index["artifacts"].values() for r in entry["revisions"]}
+        objects_dir = os.path.join(self.root, OBJECTS_DIR)
+        if os.path.isdir(objects_dir):
+            for name in os.listdir(objects_dir):
+                if name.endswith(".z") and name[:-2] not in referenced:
+                    os.remove(os.path.join(objects_dir, name))
+        return dropped
+
+    def gc(self) -> int:
+        with self._lock:
+            index = self._load()
+            dropped = self._gc_locked(index)
+            self._save(index)
+            return dropped
+
+    # --- Migration ---
+    def migrate_legacy(self) -> int:
+        """Import ``<artifact>_vYYYYMMDD_HHMMSS.md`` copies as revisions; returns how many were new.
+
+        The copies are left where they are (they may be tracked in git) and
+        each is imported only once; retention never drops imported revisions.
+        """
+        with self._lock:
+            index = self._load()
+            imported = set(index["imported"])
+            legacy = []
+            for name in os.listdir(self.usecase_path):
+                match = LEGACY_VERSION_RE.match(name)
+                if match and name not in imported and os.path.isfile(os.path.join(self.usecase_path, name)):
+                    legacy.append((f"{match['base']}.md", match["version"], name))
+            if not legacy:
+                return 0
+            for artifact, version, name in sorted(legacy):
+                entry = self._entry(index, artifact)
+                with open(os.path.join(self.usecase_path, name), "rb") as f:
+                    data = f.read()
+                sha, stored_size = self._put_object(data)
+                if not any(r["sha256"] == sha and r["version"] == version for r in entry["revisions"]):
+                    created_at = datetime.datetime.strptime(version, "%Y%m%d_%H%M%S").timestamp()
+                    self._add_revision(entry, sha, len(data), stored_size, created_at, IMPORTED, version)
+                index["imported"].append(name)
+            self._save(index)
+            logging.info(f"Imported {len(legacy)} legacy versions into {self.root}")
+            return len(legacy)
+
+    def imported_files(self) -> set:
+        """Names of the legacy ``_v`` copies already imported as revisions."""
+        return set(self._load()["imported"])
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+_opened = set()
+
+
+def _lock_for(usecase_path: str) -> threading.RLock:
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(usecase_path), threading.RLock())
+
+
+def get_version_store(usecase_path: str) -> VersionStore:
+    """Version store of a use case.
+
+    The first time a use case is opened in this process, legacy ``_v``
+    copies are imported. Working files changed outside the app are picked
+    up whenever the manifest is read.
+    """
+    store = VersionStore(usecase_path)
+    key = os.path.abspath(usecase_path)
+    with _lock_for(usecase_path):
+        if key not in _opened and os.path.isdir(usecase_path):
+            try:
+                store.migrate_legacy()
+                _opened.add(key)
+            except (OSError, ValueError) as e:
+                logging.error(f"Opening the version store in {usecase_path} failed: {e}")
+    return store